@@ -0,0 +1,104 @@
+"""
+Per-page cost of the diff hot path: the original compare_images plus the report's
+diff-image rescans, against DiffKernel. Reports time per page and peak allocations
+(tracemalloc sees NumPy and OpenCV output buffers).
+
+    python benchmarks/bench_compare_images.py --pages 20
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.diff_kernel import DiffKernel  # noqa: E402
+
+
+def legacy_compare_images(img1, img2, threshold, color_intensity):
+    # compare_images as it was before DiffKernel, kept here as the baseline.
+    height = max(img1.shape[0], img2.shape[0])
+    width = max(img1.shape[1], img2.shape[1])
+    img1_resized = cv2.resize(img1, (width, height))
+    img2_resized = cv2.resize(img2, (width, height))
+    gray1 = cv2.cvtColor(img1_resized, cv2.COLOR_RGB2GRAY)
+    gray2 = cv2.cvtColor(img2_resized, cv2.COLOR_RGB2GRAY)
+    diff = cv2.absdiff(gray1, gray2)
+    _, thresh = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)
+    result = np.zeros_like(img1_resized)
+    result[thresh == 0] = [0, 255, 0]
+    result[thresh != 0] = [0, 0, 255]
+    alpha = 1 - color_intensity
+    return cv2.addWeighted(img1_resized, alpha, result, 1 - alpha, 0)
+
+
+def legacy_page(img1, img2, threshold, color_intensity):
+    image = legacy_compare_images(img1, img2, threshold, color_intensity)
+    # The report scanned every diff image twice.
+    changed = np.any(image[:, :, 2] == 255)
+    changed = np.any(image[:, :, 2] == 255) and changed
+    return image
+
+
+def kernel_page(kernel, img1, img2, threshold, color_intensity):
+    base, stats = kernel.diff(img1, img2, threshold)
+    return kernel.colorize(base, color_intensity, stats['changed_boxes'])
+
+
+def synthetic_page(rng, height, width, edits):
+    page = np.full((height, width, 3), 255, np.uint8)
+    for _ in range(400):
+        x, y = int(rng.integers(0, width - 200)), int(rng.integers(0, height - 20))
+        cv2.putText(page, "lorem ipsum dolor", (x, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
+    edited = page.copy()
+    for _ in range(edits):
+        x, y = int(rng.integers(0, width - 200)), int(rng.integers(0, height - 20))
+        cv2.putText(edited, "CHANGED", (x, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
+    return page, edited
+
+
+def measure(name, run, pages):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for img1, img2 in pages:
+        run(img1, img2)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_page = elapsed / len(pages) * 1000
+    print(f"{name:<10} {per_page:8.2f} ms/page   peak allocations {peak / 1024 ** 2:8.1f} MiB")
+    return per_page, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--height", type=int, default=1684)
+    parser.add_argument("--width", type=int, default=1190)
+    parser.add_argument("--edits", type=int, default=3)
+    parser.add_argument("--threshold", type=int, default=30)
+    parser.add_argument("--intensity", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pages = [synthetic_page(rng, args.height, args.width, args.edits) for _ in range(args.pages)]
+
+    expected = legacy_compare_images(*pages[0], args.threshold, args.intensity)
+    actual = kernel_page(DiffKernel(), *pages[0], args.threshold, args.intensity)
+    print(f"max channel difference vs. legacy output: {int(np.abs(expected.astype(int) - actual).max())}")
+
+    # A fresh kernel, so its working buffers are allocated inside the measured run.
+    kernel = DiffKernel()
+    before = measure("before", lambda a, b: legacy_page(a, b, args.threshold, args.intensity), pages)
+    after = measure("after", lambda a, b: kernel_page(kernel, a, b, args.threshold, args.intensity), pages)
+    buffers = sum(value.nbytes for value in vars(kernel).values() if isinstance(value, np.ndarray))
+    print(f"kernel buffers {buffers / 1024 ** 2:.1f} MiB, allocated once and reused for every page")
+    print(f"speedup {before[0] / after[0]:.2f}x, peak allocations {before[1] / max(after[1], 1):.1f}x lower")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Reproducible synthetic PDF pairs for the benchmarks.
+
+Each case describes the first document (page count, page size and content mix) and
+the controlled edits applied to produce the second one. The same seed always yields
+byte-identical documents, so timings can be compared across commits.
+"""
+import os
+import random
+from typing import Dict, Any, Tuple
+
+import cv2
+import fitz
+import numpy as np
+
+PAGE_SIZES = {
+    'a4': fitz.paper_rect('a4'),
+    'letter': fitz.paper_rect('letter'),
+    'a3': fitz.paper_rect('a3'),
+}
+
+WORDS = (
+    "contrato cláusula parte valor prazo pagamento entrega serviço fornecedor cliente "
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua invoice total amount due date"
+).split()
+
+CASES: Dict[str, Dict[str, Any]] = {
+    'text_a4_10': {'pages': 10, 'size': 'a4', 'content': 'text', 'text_edits': 3},
+    'text_letter_50': {'pages': 50, 'size': 'letter', 'content': 'text', 'text_edits': 5, 'insert_pages': 1},
+    'image_a4_10': {'pages': 10, 'size': 'a4', 'content': 'image', 'image_edits': 2},
+    'mixed_a3_20': {'pages': 20, 'size': 'a3', 'content': 'mixed', 'text_edits': 4, 'image_edits': 2, 'delete_pages': 1},
+}
+
+QUICK_CASES = ('text_a4_10', 'image_a4_10')
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _image_bytes(rng: random.Random, width: int, height: int) -> bytes:
+    # Smooth gradients plus noise: compresses like a photo rather than a flat fill.
+    seed = rng.randrange(2 ** 32)
+    noise = np.random.default_rng(seed).integers(0, 64, (height, width, 3), dtype=np.uint8)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1).astype(np.uint8)
+    _, encoded = cv2.imencode('.png', cv2.add(base, noise))
+    return encoded.tobytes()
+
+
+def _fill_page(page: fitz.Page, rng: random.Random, content: str) -> None:
+    rect = page.rect
+    margin = 50
+    if content in ('text', 'mixed'):
+        page.insert_text((margin, margin + 10), _paragraph(rng, 6).title(), fontsize=16)
+        bottom = rect.height - margin if content == 'text' else rect.height / 2
+        page.insert_textbox(fitz.Rect(margin, margin + 30, rect.width - margin, bottom), _paragraph(rng, 400), fontsize=10)
+        page.draw_line((margin, margin + 20), (rect.width - margin, margin + 20), color=(0.2, 0.2, 0.2), width=0.5)
+    if content in ('image', 'mixed'):
+        top = margin if content == 'image' else rect.height / 2 + 10
+        cols = 2
+        rows = 3 if content == 'image' else 1
+        cell_w = (rect.width - 2 * margin) / cols
+        cell_h = (rect.height - margin - top) / rows
+        for r in range(rows):
+            for c in range(cols):
+                cell = fitz.Rect(margin + c * cell_w, top + r * cell_h, margin + (c + 1) * cell_w - 8, top + (r + 1) * cell_h - 8)
+                page.insert_image(cell, stream=_image_bytes(rng, 160, 120))
+        page.insert_text((margin, rect.height - 20), _paragraph(rng, 8), fontsize=9)
+
+
+def _build(spec: Dict[str, Any], seed: int) -> fitz.Document:
+    rng = random.Random(seed)
+    doc = fitz.open()
+    size = PAGE_SIZES[spec['size']]
+    for _ in range(spec['pages']):
+        page = doc.new_page(width=size.width, height=size.height)
+        _fill_page(page, rng, spec['content'])
+    return doc
+
+
+def generate_pair(name: str, spec: Dict[str, Any], out_dir: str, seed: int = 1234) -> Tuple[str, str]:
+    """
+    Write <name>_v1.pdf and <name>_v2.pdf to out_dir and return their paths. Existing
+    files are reused; the content only depends on the spec and the seed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    pdf1_path = os.path.join(out_dir, f"{name}_v1.pdf")
+    pdf2_path = os.path.join(out_dir, f"{name}_v2.pdf")
+    if os.path.exists(pdf1_path) and os.path.exists(pdf2_path):
+        return pdf1_path, pdf2_path
+
+    _build(spec, seed).save(pdf1_path, garbage=3, deflate=True)
+
+    doc = _build(spec, seed)
+    rng = random.Random(seed + 1)
+    size = PAGE_SIZES[spec['size']]
+    for _ in range(spec.get('text_edits', 0)):
+        page = doc[rng.randrange(len(doc))]
+        y = rng.uniform(100, page.rect.height / 2 - 40)
+        page.add_redact_annot(fitz.Rect(50, y, page.rect.width / 2, y + 12), fill=(1, 1, 1))
+        page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+        page.insert_text((50, y + 10), _paragraph(rng, 5).upper(), fontsize=10)
+    for _ in range(spec.get('image_edits', 0)):
+        page = doc[rng.randrange(len(doc))]
+        x, y = rng.uniform(60, page.rect.width - 200), rng.uniform(60, page.rect.height - 160)
+        page.insert_image(fitz.Rect(x, y, x + 120, y + 90), stream=_image_bytes(rng, 120, 90))
+    for _ in range(spec.get('delete_pages', 0)):
+        doc.delete_page(rng.randrange(len(doc)))
+    for _ in range(spec.get('insert_pages', 0)):
+        page = doc.new_page(rng.randrange(len(doc) + 1), width=size.width, height=size.height)
+        _fill_page(page, rng, spec['content'])
+    doc.save(pdf2_path, garbage=3, deflate=True)
+    return pdf1_path, pdf2_path
@@ -0,0 +1,211 @@
+"""
+Benchmark suite for the PDFComparisonTool pipeline.
+
+Generates the synthetic corpus (see corpus.py) and times each stage separately:
+convert_pdf_to_images, enhance_image, compare_images, text extraction, text diff,
+report generation and the end-to-end streaming comparison. Every (case, stage) runs
+in a fresh process so its peak RSS is not inflated by earlier stages; the peak
+includes the untimed setup the stage needs (e.g. rendered pages for compare_images).
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --quick --compare results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import List, Dict, Any, Callable, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from corpus import CASES, QUICK_CASES, generate_pair  # noqa: E402
+
+STAGES = (
+    'convert_pdf_to_images',
+    'enhance_image',
+    'compare_images',
+    'text_extraction',
+    'text_diff',
+    'report',
+    'process_pdfs_streaming',
+)
+
+DEFAULT_REPEAT = 5
+# A stage only counts as a regression when it is both relatively and absolutely worse:
+# short stages easily vary by more than the tolerance from one run to the next.
+MIN_TIME_DELTA = 0.05
+MIN_RSS_DELTA_MB = 10.0
+
+
+def peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _timed(setup: Callable[[], Any], run: Callable[[Any], int]) -> Dict[str, Any]:
+    state = setup()
+    start = time.perf_counter()
+    pages = run(state)
+    return {'wall_time': time.perf_counter() - start, 'pages': pages}
+
+
+def run_stage(stage: str, pdf1_path: str, pdf2_path: str) -> Dict[str, Any]:
+    from src.pdf_tool import PDFComparisonTool
+
+    tool = PDFComparisonTool()
+
+    def render():
+        return tool.convert_pdf_to_images(pdf1_path), tool.convert_pdf_to_images(pdf2_path)
+
+    def enhance(images):
+        return [tool.enhance_image(img) for img in images[0]], [tool.enhance_image(img) for img in images[1]]
+
+    if stage == 'convert_pdf_to_images':
+        result = _timed(lambda: None, lambda _: sum(len(images) for images in render()))
+    elif stage == 'enhance_image':
+        result = _timed(render, lambda images: sum(len(enhanced) for enhanced in enhance(images)))
+    elif stage == 'compare_images':
+        def compare(enhanced):
+            pairs = list(zip(*enhanced))
+            for img1, img2 in pairs:
+                tool.compare_images(img1, img2)
+            return len(pairs)
+        result = _timed(lambda: enhance(render()), compare)
+    elif stage == 'text_extraction':
+        def extract(_):
+            infos = tool.extract_text_and_metadata(pdf1_path), tool.extract_text_and_metadata(pdf2_path)
+            return sum(len(info['words']) for info in infos)
+        result = _timed(lambda: None, extract)
+    elif stage == 'text_diff':
+        def diff(infos):
+            tool.compare_text_pages(infos[0]['words'], infos[1]['words'])
+            return max(len(infos[0]['words']), len(infos[1]['words']))
+        result = _timed(lambda: (tool.extract_text_and_metadata(pdf1_path), tool.extract_text_and_metadata(pdf2_path)), diff)
+    elif stage == 'report':
+        def report(_):
+            tool.generate_comparison_report(pdf1_path, pdf2_path)
+            return len(tool.diff_images)
+        result = _timed(lambda: tool.process_pdfs_streaming(pdf1_path, pdf2_path), report)
+    elif stage == 'process_pdfs_streaming':
+        result = _timed(lambda: None, lambda _: len(tool.process_pdfs_streaming(pdf1_path, pdf2_path)))
+    else:
+        raise ValueError(f"Etapa desconhecida: {stage}")
+
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return result
+
+
+def run_isolated(stage: str, pdf1_path: str, pdf2_path: str, isolate: bool) -> Dict[str, Any]:
+    if not isolate:
+        return run_stage(stage, pdf1_path, pdf2_path)
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(run_stage, (stage, pdf1_path, pdf2_path))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=HERE, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(cases: List[str], stages: List[str], corpus_dir: str, repeat: int, isolate: bool) -> Dict[str, Any]:
+    results = []
+    for case in cases:
+        pdf1_path, pdf2_path = generate_pair(case, CASES[case], corpus_dir)
+        for stage in stages:
+            # Keep the fastest run: the noise on a shared machine only ever adds time.
+            runs = [run_isolated(stage, pdf1_path, pdf2_path, isolate) for _ in range(repeat)]
+            best = min(runs, key=lambda run: run['wall_time'])
+            entry = {
+                'case': case,
+                'stage': stage,
+                'pages': best['pages'],
+                'wall_time': round(best['wall_time'], 4),
+                'pages_per_second': round(best['pages'] / best['wall_time'], 2) if best['wall_time'] > 0 else None,
+                'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+            }
+            results.append(entry)
+            print(f"{case:<16} {stage:<24} {entry['wall_time']:9.3f}s {entry['pages_per_second'] or 0:10.2f} pág/s "
+                  f"{entry['peak_rss_mb']:9.1f} MB")
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+                    min_time_delta: float = MIN_TIME_DELTA, min_rss_delta: float = MIN_RSS_DELTA_MB) -> List[Dict[str, Any]]:
+    """
+    Print the time and memory ratio of every (case, stage) present in both runs and
+    return the entries slower or larger than the baseline by more than tolerance and
+    by more than min_time_delta seconds or min_rss_delta MB.
+    """
+    baseline_index = {(entry['case'], entry['stage']): entry for entry in baseline['results']}
+    regressions = []
+    print(f"\nComparação com {baseline['meta'].get('commit') or 'linha de base'}:")
+    for entry in current['results']:
+        base = baseline_index.get((entry['case'], entry['stage']))
+        if base is None:
+            continue
+        time_ratio = entry['wall_time'] / base['wall_time'] if base['wall_time'] else 1.0
+        rss_ratio = entry['peak_rss_mb'] / base['peak_rss_mb'] if base['peak_rss_mb'] else 1.0
+        slower = time_ratio > 1 + tolerance and entry['wall_time'] - base['wall_time'] > min_time_delta
+        larger = rss_ratio > 1 + tolerance and entry['peak_rss_mb'] - base['peak_rss_mb'] > min_rss_delta
+        regressed = slower or larger
+        print(f"{entry['case']:<16} {entry['stage']:<24} tempo {time_ratio:6.2f}x  memória {rss_ratio:6.2f}x"
+              f"{'  REGRESSÃO' if regressed else ''}")
+        if regressed:
+            regressions.append(dict(entry, time_ratio=round(time_ratio, 3), rss_ratio=round(rss_ratio, 3)))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs='+', choices=sorted(CASES), help="Casos a executar (padrão: todos)")
+    parser.add_argument("--stages", nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument("--quick", action="store_true", help=f"Apenas {', '.join(QUICK_CASES)}")
+    parser.add_argument("--corpus-dir", default=os.path.join(HERE, "corpus"))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Execuções por etapa; vale a mais rápida")
+    parser.add_argument("--no-isolate", action="store_true", help="Executa as etapas no mesmo processo (RSS cumulativo)")
+    parser.add_argument("--output", "-o", help="Arquivo JSON com os resultados")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Aumento relativo tolerado antes de acusar regressão")
+    parser.add_argument("--min-time-delta", type=float, default=MIN_TIME_DELTA,
+                        help="Aumento mínimo de tempo, em segundos, para acusar regressão")
+    parser.add_argument("--min-rss-delta", type=float, default=MIN_RSS_DELTA_MB,
+                        help="Aumento mínimo de memória, em MB, para acusar regressão")
+    args = parser.parse_args(argv)
+
+    cases = args.cases or (list(QUICK_CASES) if args.quick else list(CASES))
+    current = run_suite(cases, args.stages, args.corpus_dir, max(1, args.repeat), not args.no_isolate)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(current, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            regressions = compare_results(current, json.load(baseline_file), args.tolerance,
+                                          args.min_time_delta, args.min_rss_delta)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,7 +12,8 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "pdfcomparator=src.main:main",
+            "pdfcomparator=src.cli:main",
+            "pdfcomparator-server=src.service:main",
         ],
     },
     author="Your Name",
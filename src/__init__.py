@@ -1,2 +1,7 @@
 from .pdf_tool import PDFComparisonTool
-from .gui import PDFComparisonGUI
\ No newline at end of file
+
+try:
+    from .gui import PDFComparisonGUI
+except ImportError:
+    # Tkinter is not available on headless servers; the CLI does not need it.
+    PDFComparisonGUI = None
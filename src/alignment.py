@@ -0,0 +1,152 @@
+import cv2
+import fitz
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from .text_diff import match_tokens
+from .ingest import DocumentContent
+
+PagePair = Tuple[Optional[int], Optional[int]]
+
+# Pages scoring at or below this are never paired when a gap has pages inserted or deleted.
+MIN_PAGE_SIMILARITY = 0.3
+
+
+class PageSignatures:
+    """
+    Cheap per-page signatures used to align two documents: the exact content
+    fingerprint, the multiset of its words and, for pages without text, a 64-bit
+    difference hash of a thumbnail. Word counts and hashes are computed lazily, only for pages that are
+    not matched by fingerprint. With a DocumentContent the words are taken from (and
+    stored in) it, so pages parsed for alignment are not parsed again for the report.
+    """
+
+    def __init__(self, pdf_document: fitz.Document, fingerprints: List[str], content: Optional[DocumentContent] = None):
+        self.pdf_document = pdf_document
+        self.fingerprints = fingerprints
+        self.content = content
+        self._words: Dict[int, Counter] = {}
+        self._dhashes: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def words(self, page_index: int) -> Counter:
+        if page_index not in self._words:
+            page = self.pdf_document[page_index]
+            page_words = self.content.page_words(page) if self.content is not None else page.get_text("words")
+            self._words[page_index] = Counter(word[4] for word in page_words)
+        return self._words[page_index]
+
+    def dhash(self, page_index: int) -> int:
+        if page_index not in self._dhashes:
+            pix = self.pdf_document[page_index].get_pixmap(matrix=fitz.Matrix(0.1, 0.1), colorspace=fitz.csGRAY)
+            gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+            small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+            bits = (small[:, 1:] > small[:, :-1]).ravel()
+            self._dhashes[page_index] = int(np.packbits(bits).view('>u8')[0])
+        return self._dhashes[page_index]
+
+
+def page_similarity(signatures1: PageSignatures, i: int, signatures2: PageSignatures, j: int) -> float:
+    if signatures1.fingerprints[i] == signatures2.fingerprints[j]:
+        return 1.0
+    words1 = signatures1.words(i)
+    words2 = signatures2.words(j)
+    if words1 or words2:
+        # Dice coefficient of the word multisets: on a sparse page (an invoice, a form)
+        # editing a few numbers only removes those words, not every overlapping shingle.
+        common = sum((words1 & words2).values())
+        return 2 * common / (sum(words1.values()) + sum(words2.values()))
+    return 1.0 - bin(signatures1.dhash(i) ^ signatures2.dhash(j)).count('1') / 64
+
+
+def _align_gap(signatures1: PageSignatures, i_lo: int, i_hi: int, signatures2: PageSignatures, j_lo: int, j_hi: int,
+               min_similarity: float, band: int) -> List[PagePair]:
+    # Banded weighted-LCS: a pair scores (similarity - min_similarity) and only pairs
+    # above the threshold are matched; everything else becomes an insertion or deletion.
+    n = i_hi - i_lo
+    m = j_hi - j_lo
+    # The band needs at least one off-diagonal cell on each side, otherwise some cells
+    # cannot be reached and the backtrack fails.
+    band = max(band, 1)
+    lo_offset = min(0, m - n) - band
+    hi_offset = max(0, m - n) + band
+    score: List[Dict[int, float]] = [{} for _ in range(n + 1)]
+    moves: List[Dict[int, str]] = [{} for _ in range(n + 1)]
+    score[0][0] = 0.0
+    for a in range(n + 1):
+        for b in range(max(0, a + lo_offset), min(m, a + hi_offset) + 1):
+            if a == 0 and b == 0:
+                continue
+            best, move = float('-inf'), ''
+            if a > 0 and b in score[a - 1]:
+                best, move = score[a - 1][b], 'delete'
+            if b > 0 and b - 1 in score[a] and score[a][b - 1] > best:
+                best, move = score[a][b - 1], 'insert'
+            if a > 0 and b > 0 and b - 1 in score[a - 1]:
+                gain = page_similarity(signatures1, i_lo + a - 1, signatures2, j_lo + b - 1) - min_similarity
+                if gain > 0 and score[a - 1][b - 1] + gain >= best:
+                    best, move = score[a - 1][b - 1] + gain, 'match'
+            score[a][b] = best
+            moves[a][b] = move
+
+    pairs: List[PagePair] = []
+    a, b = n, m
+    while a > 0 or b > 0:
+        move = moves[a][b]
+        if move == 'match':
+            a, b = a - 1, b - 1
+            pairs.append((i_lo + a, j_lo + b))
+        elif move == 'delete':
+            a -= 1
+            pairs.append((i_lo + a, None))
+        else:
+            b -= 1
+            pairs.append((None, j_lo + b))
+    pairs.reverse()
+    return _pair_by_position(pairs)
+
+
+def _pair_by_position(pairs: List[PagePair]) -> List[PagePair]:
+    # Between two matches (or the ends of the gap), as many deleted as inserted pages
+    # means both matches sit on the same offset: those pages were edited past the
+    # similarity threshold, not removed and added, so they pair up by position.
+    result: List[PagePair] = []
+    stretch: List[PagePair] = []
+    for pair in pairs + [(-1, -1)]:
+        if pair[0] is None or pair[1] is None:
+            stretch.append(pair)
+            continue
+        deleted = [i for i, j in stretch if j is None]
+        inserted = [j for i, j in stretch if i is None]
+        result.extend(zip(deleted, inserted) if len(deleted) == len(inserted) else stretch)
+        stretch = []
+        result.append(pair)
+    return result[:-1]
+
+
+def align_pages(signatures1: PageSignatures, signatures2: PageSignatures, min_similarity: float = MIN_PAGE_SIMILARITY,
+                band: int = 16) -> List[PagePair]:
+    """
+    Align the page sequences of two documents. Pages with identical fingerprints anchor
+    the alignment (patience diff). Between anchors, pages are aligned by similarity
+    within a band around the diagonal; unmatched pages left on the same offset as the
+    surrounding matches are then paired by position. Returns (pdf1 index, pdf2 index) pairs in
+    document order, with None marking a page deleted from or inserted into pdf2.
+    """
+    anchors = match_tokens([hash(fp) for fp in signatures1.fingerprints], [hash(fp) for fp in signatures2.fingerprints])
+    pairs: List[PagePair] = []
+    i = j = 0
+    for anchor_i, anchor_j in anchors + [(len(signatures1), len(signatures2))]:
+        if i < anchor_i or j < anchor_j:
+            pairs.extend(_align_gap(signatures1, i, anchor_i, signatures2, j, anchor_j, min_similarity, band))
+        if anchor_i < len(signatures1):
+            pairs.append((anchor_i, anchor_j))
+        i, j = anchor_i + 1, anchor_j + 1
+    return pairs
+
+
+def index_pairs(pdf1_pages: int, pdf2_pages: int) -> List[PagePair]:
+    # Pairing by position, for callers that disable alignment.
+    return [(i if i < pdf1_pages else None, i if i < pdf2_pages else None) for i in range(max(pdf1_pages, pdf2_pages))]
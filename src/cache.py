@@ -0,0 +1,122 @@
+import os
+import hashlib
+import tempfile
+import threading
+import logging
+import zipfile
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+CACHE_SUFFIX = ".npz"
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as pdf_file:
+        for chunk in iter(lambda: pdf_file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pdfcomparator", "renders")
+
+
+class RenderCache:
+    """
+    Disk-backed cache of rendered page rasters.
+
+    Entries are keyed by the SHA-256 of the PDF contents, the page index and the zoom
+    matrix, so overwriting a file at the same path never returns stale pages. Rasters
+    are stored deflated in .npz files (a rendered text page shrinks 20-50x), so the
+    baseline and several revisions of a long document fit in the budget; the least
+    recently used entries are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        # Size of the cache directory, measured by the first evict(): short-lived instances
+        # that only read from the cache never scan it.
+        self._total_bytes: Optional[int] = None
+
+    def file_hash(self, pdf_path: str) -> str:
+        stat = os.stat(pdf_path)
+        memo_key = (os.path.realpath(pdf_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._hashes:
+            self._hashes[memo_key] = file_digest(pdf_path)
+        return self._hashes[memo_key]
+
+    def page_key(self, pdf_hash: str, page_index: int, zoom_x: float, zoom_y: float) -> str:
+        return f"{pdf_hash}_{page_index}_{zoom_x:g}x{zoom_y:g}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}{CACHE_SUFFIX}")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        try:
+            with np.load(path) as entry:
+                image = entry['image']
+            os.utime(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        return image
+
+    def put(self, key: str, image: np.ndarray) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                np.savez_compressed(tmp_file, image=image)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Falha ao gravar página no cache: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            if self._total_bytes is None:
+                self.evict()
+            else:
+                self._total_bytes += os.path.getsize(path)
+                if self._total_bytes > self.max_bytes:
+                    self.evict()
+
+    def evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
+
+    def clear(self) -> None:
+        for _, path, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+        self._total_bytes = 0
+
+    def _entries(self):
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                # Uncompressed .npy entries of earlier versions are only kept until evicted.
+                if entry.name.endswith((CACHE_SUFFIX, '.npy')):
+                    stat = entry.stat()
+                    yield stat.st_mtime, entry.path, stat.st_size
@@ -0,0 +1,339 @@
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+from .metrics import ChromeTrace
+from .pdf_tool import PDFComparisonTool
+from .session import ComparisonStore
+
+SUMMARY_FILE = "summary.json"
+REPORT_FILE = "report.txt"
+BATCH_SUMMARY_FILE = "batch_summary.json"
+TRACE_FILE = "trace.json"
+
+
+def job_id_for(pdf1_path: str, pdf2_path: str) -> str:
+    # Stable across runs so an interrupted batch can be resumed from the same manifest.
+    stem = re.sub(r'[^A-Za-z0-9._-]+', '_', os.path.splitext(os.path.basename(pdf2_path))[0])
+    digest = hashlib.sha1(f"{os.path.abspath(pdf1_path)}\0{os.path.abspath(pdf2_path)}".encode()).hexdigest()[:10]
+    return f"{stem}-{digest}"
+
+
+def safe_job_id(job_id: str) -> str:
+    # Job ids name directories inside the output directory: no separators, no "." or "..".
+    safe = re.sub(r'[^A-Za-z0-9._-]+', '_', job_id.strip()).lstrip('.')
+    if not safe:
+        raise ValueError(f"Identificador de comparação inválido: {job_id!r}")
+    return safe
+
+
+def read_manifest(manifest_path: str) -> List[Dict[str, str]]:
+    """
+    Read the pairs to compare. JSON Lines manifests hold one {"pdf1", "pdf2", "id"}
+    object per line; anything else is read as CSV with pdf1,pdf2[,id] columns and an
+    optional header. Relative paths are resolved against the manifest's directory;
+    ids are reduced to safe directory names and must be unique.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    rows = []
+    with open(manifest_path, newline='', encoding='utf-8') as manifest:
+        if manifest_path.endswith(('.jsonl', '.ndjson')):
+            for line in manifest:
+                if line.strip():
+                    rows.append(json.loads(line))
+        else:
+            for row in csv.reader(manifest):
+                if not row or row[0].startswith('#') or [cell.strip().lower() for cell in row[:2]] == ['pdf1', 'pdf2']:
+                    continue
+                rows.append({'pdf1': row[0], 'pdf2': row[1], 'id': row[2] if len(row) > 2 else None})
+
+    jobs = []
+    for row in rows:
+        pdf1_path = os.path.join(base_dir, row['pdf1'].strip())
+        pdf2_path = os.path.join(base_dir, row['pdf2'].strip())
+        job_id = safe_job_id(str(row['id'])) if row.get('id') else job_id_for(pdf1_path, pdf2_path)
+        jobs.append({'id': job_id, 'pdf1': pdf1_path, 'pdf2': pdf2_path})
+    check_unique_jobs(jobs)
+    return jobs
+
+
+def check_unique_jobs(jobs: List[Dict[str, str]]) -> None:
+    # Two jobs sharing a directory would overwrite each other's results.
+    seen = set()
+    for job in jobs:
+        job_dir = job.get('dir', job['id'])
+        if job_dir in seen or job['id'] in seen:
+            raise ValueError(f"Identificador de comparação repetido: {job['id']}")
+        seen.update((job_dir, job['id']))
+
+
+def job_inputs(job: Dict[str, str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    # Identifies the files a summary was computed from; regenerated files get a new mtime.
+    inputs = {}
+    for key in ('pdf1', 'pdf2'):
+        try:
+            stat = os.stat(job[key])
+        except OSError:
+            return None
+        inputs[key] = {'path': os.path.abspath(job[key]), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    return inputs
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_summary(job_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(job_dir, SUMMARY_FILE), encoding='utf-8') as summary_file:
+            return json.load(summary_file)
+    except (OSError, ValueError):
+        return None
+
+
+def page_summary(diff_data: Dict[str, Any], has_differences: bool) -> Dict[str, Any]:
+    summary = {
+        'page_number': diff_data['page_number'],
+        'pdf1_page': diff_data.get('pdf1_page'),
+        'pdf2_page': diff_data.get('pdf2_page'),
+        'status': diff_data.get('status'),
+        'identical': diff_data.get('identical', False),
+        'has_differences': has_differences,
+        'changed_pixels': diff_data.get('changed_pixels'),
+        'changed_boxes': diff_data.get('changed_boxes'),
+    }
+    if 'vector_changes' in diff_data:
+        summary['vector_changes'] = diff_data['vector_changes']
+    return summary
+
+
+def run_job(job: Dict[str, str], job_dir: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    os.makedirs(job_dir, exist_ok=True)
+    inputs = job_inputs(job)
+    tool = PDFComparisonTool(cache_dir=options['cache_dir'])
+    tool.threshold = options['threshold']
+    tool.color_intensity = options['color_intensity']
+    images_dir = job_dir if options['images'] else None
+    trace = ChromeTrace() if options.get('trace') else None
+    if trace:
+        tool.metrics.add_sink(trace)
+
+    start = time.time()
+    if options['mode'] == 'tiled':
+        tool.process_pdfs_tiled(job['pdf1'], job['pdf2'], images_dir)
+    elif options['mode'] == 'vector':
+        tool.process_pdfs_vector(job['pdf1'], job['pdf2'], images_dir)
+    elif options.get('store'):
+        tool.process_pdfs_incremental(job['pdf1'], job['pdf2'], ComparisonStore(options['store']), images_dir)
+    elif options['workers'] > 1:
+        tool.process_pdfs_parallel(job['pdf1'], job['pdf2'], options['workers'], images_dir)
+    else:
+        tool.process_pdfs_streaming(job['pdf1'], job['pdf2'], images_dir)
+
+    summary = tool.comparison_summary(job['pdf1'], job['pdf2'])
+    if options['report']:
+        with open(os.path.join(job_dir, REPORT_FILE), 'w', encoding='utf-8') as report_file:
+            report_file.write(tool.generate_comparison_report(job['pdf1'], job['pdf2'], summary))
+
+    result = {
+        'id': job['id'],
+        'pdf1': job['pdf1'],
+        'pdf2': job['pdf2'],
+        'status': 'ok',
+        'inputs': inputs,
+        'elapsed': round(time.time() - start, 3),
+        'text_similarity': summary['text_similarity'],
+        'text_changes': len(summary['text_diff']['spans']),
+        'metadata_diff': {key: list(values) for key, values in summary['metadata_diff'].items()},
+        'total_pages': summary['total_pages'],
+        'pages_with_differences': summary['pages_with_differences'],
+        'identical_pages': summary['identical_pages'],
+        'deleted_pages': summary['deleted_pages'],
+        'inserted_pages': summary['inserted_pages'],
+        'pages': [page_summary(diff_data, tool.page_has_differences(diff_data)) for diff_data in tool.diff_images],
+        'metrics': tool.metrics.summary(),
+    }
+    if trace:
+        trace.write(os.path.join(job_dir, TRACE_FILE))
+    write_json(os.path.join(job_dir, SUMMARY_FILE), result)
+    return result
+
+
+def _job_process(job: Dict[str, str], job_dir: str, options: Dict[str, Any]) -> None:
+    if hasattr(os, 'setpgrp'):
+        # Its own process group, so a timeout also stops the pool workers of --workers.
+        os.setpgrp()
+    try:
+        run_job(job, job_dir, options)
+    except Exception as e:
+        logging.error(f"Erro ao comparar {job['pdf1']} com {job['pdf2']}: {str(e)}", exc_info=True)
+        sys.exit(1)
+
+
+def terminate_job(process: multiprocessing.Process) -> None:
+    # Kills the job and every process it started; the pool workers of a parallel job
+    # would otherwise be orphaned and keep the caller's pipes open.
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            # The job did not get to create its group yet.
+            process.terminate()
+    else:
+        process.terminate()
+    process.join()
+
+
+def failed_summary(job: Dict[str, str], status: str, error: str, elapsed: float) -> Dict[str, Any]:
+    return {'id': job['id'], 'pdf1': job['pdf1'], 'pdf2': job['pdf2'], 'status': status, 'error': error, 'elapsed': round(elapsed, 3)}
+
+
+def run_batch(jobs: List[Dict[str, str]], output_dir: str, options: Dict[str, Any], max_jobs: int,
+              timeout: Optional[float] = None, resume: bool = True) -> List[Dict[str, Any]]:
+    """
+    Run the jobs with at most max_jobs comparisons at a time. Each job runs in its own
+    process, so one that exceeds the timeout can be terminated without affecting the
+    others. With resume, jobs whose summary already records success for the same
+    input files (path, size and modification time) are skipped.
+    """
+    check_unique_jobs(jobs)
+    os.makedirs(output_dir, exist_ok=True)
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = deque()
+    for job in jobs:
+        summary = read_summary(os.path.join(output_dir, job.get('dir', job['id']))) if resume else None
+        inputs = job_inputs(job) if summary else None
+        if summary and summary.get('status') == 'ok' and inputs is not None and summary.get('inputs') == inputs:
+            results[job['id']] = summary
+        else:
+            pending.append(job)
+    if len(pending) < len(jobs):
+        logging.info(f"Retomando lote: {len(jobs) - len(pending)} comparações já concluídas foram ignoradas.")
+
+    running = []
+    completed = len(results)
+    try:
+        while pending or running:
+            while pending and len(running) < max_jobs:
+                job = pending.popleft()
+                job_dir = os.path.join(output_dir, job.get('dir', job['id']))
+                process = multiprocessing.Process(target=_job_process, args=(job, job_dir, options))
+                process.start()
+                running.append((process, job, job_dir, time.time()))
+
+            still_running = []
+            for process, job, job_dir, started in running:
+                elapsed = time.time() - started
+                if process.is_alive():
+                    if timeout is not None and elapsed > timeout:
+                        terminate_job(process)
+                        summary = failed_summary(job, 'timeout', f"Tempo limite de {timeout:g}s excedido", elapsed)
+                    else:
+                        still_running.append((process, job, job_dir, started))
+                        continue
+                else:
+                    process.join()
+                    summary = read_summary(job_dir) if process.exitcode == 0 else None
+                    if summary is None:
+                        summary = failed_summary(job, 'error', f"Processo terminou com código {process.exitcode}", elapsed)
+                if summary['status'] != 'ok':
+                    os.makedirs(job_dir, exist_ok=True)
+                    write_json(os.path.join(job_dir, SUMMARY_FILE), summary)
+                results[job['id']] = summary
+                completed += 1
+                logging.info(f"[{completed}/{len(jobs)}] {job['id']}: {summary['status']}")
+            running = still_running
+            if running:
+                time.sleep(0.05)
+    except BaseException:
+        # Job processes are in their own groups and do not receive the terminal's Ctrl+C.
+        for process, _, _, _ in running:
+            terminate_job(process)
+        raise
+
+    ordered = [results[job['id']] for job in jobs]
+    write_json(os.path.join(output_dir, BATCH_SUMMARY_FILE), {
+        'total': len(ordered),
+        'ok': sum(1 for result in ordered if result['status'] == 'ok'),
+        'failed': sum(1 for result in ordered if result['status'] != 'ok'),
+        'jobs': [{key: value for key, value in result.items() if key not in ('pages', 'metrics')} for result in ordered],
+    })
+    return ordered
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pdfcomparator",
+        description="Compara PDFs sem interface gráfica: um par (PDF1 PDF2 SAIDA) ou um lote (--manifest ARQUIVO SAIDA).",
+    )
+    parser.add_argument("paths", nargs='+', help="PDF1 PDF2 SAIDA, ou apenas SAIDA com --manifest")
+    parser.add_argument("-m", "--manifest", help="CSV (pdf1,pdf2[,id]) ou JSON Lines com os pares a comparar")
+    parser.add_argument("-c", "--cache", help="Diretório do cache de páginas renderizadas")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Comparações simultâneas no lote")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Processos por comparação (renderização paralela das páginas)")
+    parser.add_argument("-t", "--timeout", type=float, help="Tempo limite por comparação, em segundos")
+    parser.add_argument("--threshold", type=int, default=30, help="Limiar de diferença (0-255)")
+    parser.add_argument("--intensity", type=float, default=0.3, help="Intensidade da cor das diferenças (0-1)")
+    parser.add_argument("--mode", choices=("streaming", "tiled", "vector"), default="streaming", help="Modo de comparação das imagens")
+    parser.add_argument("--no-images", action="store_true", help="Não grava as imagens de diferença")
+    parser.add_argument("--no-report", action="store_true", help="Não grava o relatório de texto")
+    parser.add_argument("--no-resume", action="store_true", help="Refaz comparações já concluídas")
+    parser.add_argument("--store", help="Diretório com os resultados de comparações anteriores, reaproveitados por página")
+    parser.add_argument("--trace", action="store_true", help=f"Grava {TRACE_FILE} (formato Chrome trace) com os tempos de cada etapa")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.manifest:
+        if len(args.paths) != 1:
+            parser.error("com --manifest informe apenas o diretório de saída")
+        output_dir = args.paths[0]
+        try:
+            jobs = read_manifest(args.manifest)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        if len(args.paths) != 3:
+            parser.error("informe PDF1 PDF2 SAIDA")
+        pdf1_path, pdf2_path, output_dir = args.paths
+        # A single pair writes straight into the output directory.
+        jobs = [{'id': job_id_for(pdf1_path, pdf2_path), 'pdf1': pdf1_path, 'pdf2': pdf2_path, 'dir': ''}]
+
+    options = {
+        'cache_dir': args.cache,
+        'threshold': args.threshold,
+        'color_intensity': args.intensity,
+        'mode': args.mode,
+        'workers': args.workers,
+        'images': not args.no_images,
+        'report': not args.no_report,
+        'trace': args.trace,
+        'store': args.store,
+    }
+    results = run_batch(jobs, output_dir, options, max(1, args.jobs), args.timeout, resume=not args.no_resume)
+    failed = [result for result in results if result['status'] != 'ok']
+    if failed:
+        logging.error(f"{len(failed)} de {len(results)} comparações falharam.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
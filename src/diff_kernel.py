@@ -0,0 +1,119 @@
+import cv2
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+UNCHANGED_COLOR = (0, 255, 0)
+CHANGED_COLOR = (0, 0, 255)
+
+# Changed pixels closer than this are reported as one bounding box.
+BOX_MERGE_DISTANCE = 15
+
+
+def blend_lut(color: Tuple[int, int, int], color_intensity: float) -> np.ndarray:
+    # Per-channel table of round(v * alpha + color * (1 - alpha)), the same blend as cv2.addWeighted.
+    alpha = 1 - color_intensity
+    values = np.arange(256, dtype=np.float32)[:, None] * np.float32(alpha) + np.array(color, dtype=np.float32) * np.float32(1 - alpha)
+    return np.clip(np.rint(values), 0, 255).astype(np.uint8).reshape(1, 256, 3)
+
+
+class DiffKernel:
+    """
+    Page diff kernel that reuses its working buffers between pages of the same size.
+
+    diff() computes the change mask and the per-page statistics (changed pixel count,
+    merged bounding boxes and changed flag) in one pass, so reporting never rescans
+    images. colorize() blends the overlay through lookup tables and only touches the
+    changed regions a second time. Arrays returned with reuse=True are overwritten by
+    the next call.
+    """
+
+    def __init__(self):
+        self._shape: Optional[Tuple[int, int]] = None
+        self._luts: Dict[Tuple[Tuple[int, int, int], float], np.ndarray] = {}
+        self._dilate_kernel = np.ones((BOX_MERGE_DISTANCE, BOX_MERGE_DISTANCE), np.uint8)
+
+    def _allocate(self, height: int, width: int) -> None:
+        if self._shape == (height, width):
+            return
+        self._shape = (height, width)
+        self.gray1 = np.empty((height, width), np.uint8)
+        self.gray2 = np.empty((height, width), np.uint8)
+        self.diff_map = np.empty((height, width), np.uint8)
+        self.mask = np.empty((height, width), np.uint8)
+        self.scratch_mask = np.empty((height, width), np.uint8)
+        self.overlay = np.empty((height, width, 3), np.uint8)
+        self.scratch = np.empty((height, width, 3), np.uint8)
+        self.resized1 = np.empty((height, width, 3), np.uint8)
+        self.resized2 = np.empty((height, width, 3), np.uint8)
+
+    def _lut(self, color: Tuple[int, int, int], color_intensity: float) -> np.ndarray:
+        key = (color, color_intensity)
+        if key not in self._luts:
+            if len(self._luts) > 64:
+                self._luts.clear()
+            self._luts[key] = blend_lut(color, color_intensity)
+        return self._luts[key]
+
+    def prepare(self, img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
+        """
+        Bring both images to a common size and compute the grayscale absdiff into the
+        reusable diff_map buffer. Returns the (possibly resized) first image.
+        """
+        height = max(img1.shape[0], img2.shape[0])
+        width = max(img1.shape[1], img2.shape[1])
+        self._allocate(height, width)
+        if img1.shape[:2] != (height, width):
+            img1 = cv2.resize(img1, (width, height), dst=self.resized1)
+        if img2.shape[:2] != (height, width):
+            img2 = cv2.resize(img2, (width, height), dst=self.resized2)
+        cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY, dst=self.gray1)
+        cv2.cvtColor(img2, cv2.COLOR_RGB2GRAY, dst=self.gray2)
+        cv2.absdiff(self.gray1, self.gray2, dst=self.diff_map)
+        return img1
+
+    def threshold(self, diff: np.ndarray, threshold: int) -> Dict[str, Any]:
+        self._allocate(*diff.shape)
+        cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY, dst=self.mask)
+        changed_pixels = cv2.countNonZero(self.mask)
+        return {
+            'changed_pixels': changed_pixels,
+            'has_differences': changed_pixels > 0,
+            'changed_boxes': self._boxes() if changed_pixels else [],
+        }
+
+    def diff(self, img1: np.ndarray, img2: np.ndarray, threshold: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+        base = self.prepare(img1, img2)
+        return base, self.threshold(self.diff_map, threshold)
+
+    def _boxes(self) -> List[Tuple[int, int, int, int]]:
+        cv2.dilate(self.mask, self._dilate_kernel, dst=self.scratch_mask)
+        contours, _ = cv2.findContours(self.scratch_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            # Shrink back to the changed pixels, removing the growth added by the dilation.
+            bx, by, bw, bh = cv2.boundingRect(self.mask[y:y + h, x:x + w])
+            boxes.append((x + bx, y + by, x + bx + bw, y + by + bh))
+        boxes.sort(key=lambda box: (box[1], box[0]))
+        return boxes
+
+    def colorize(self, base: np.ndarray, color_intensity: float, boxes: Optional[List[Tuple[int, int, int, int]]] = None,
+                 mask: Optional[np.ndarray] = None, reuse: bool = True) -> np.ndarray:
+        """
+        Blend the unchanged/changed colours over base using the mask from the last
+        threshold() call (or the given one). Only the pixels inside boxes are checked
+        for changes; pass boxes=None to scan the whole page.
+        """
+        self._allocate(*base.shape[:2])
+        if mask is None:
+            mask = self.mask
+        out = self.overlay if reuse else np.empty_like(base)
+        cv2.LUT(base, self._lut(UNCHANGED_COLOR, color_intensity), dst=out)
+        changed_lut = self._lut(CHANGED_COLOR, color_intensity)
+        if boxes is None:
+            boxes = [(0, 0, base.shape[1], base.shape[0])]
+        for x0, y0, x1, y1 in boxes:
+            scratch = self.scratch[y0:y1, x0:x1]
+            cv2.LUT(base[y0:y1, x0:x1], changed_lut, dst=scratch)
+            cv2.copyTo(scratch, mask[y0:y1, x0:x1], out[y0:y1, x0:x1])
+        return out
@@ -0,0 +1,92 @@
+import hashlib
+import re
+import fitz
+from typing import Any, Dict, List, Optional
+
+# Resource categories hashed through the objects they reference: an indirect reference
+# such as <</GS0 5 0 R>> is replaced by the digest of object 5, not by its number.
+_RESOURCE_KEYS = ("ExtGState", "ColorSpace", "Pattern", "Shading", "Properties")
+
+_REFERENCE = re.compile(r"(/[^\s/<>\[\]()]+)?(\s*)(\d+) (\d+) R\b")
+# Back-references to the page tree; following them would hash the whole document.
+_SKIPPED_REFERENCES = ("/Parent", "/P")
+
+
+def _stream_digest(pdf_document: fitz.Document, xref: int, memo: Dict[Any, bytes]) -> bytes:
+    if xref not in memo:
+        try:
+            data = pdf_document.xref_stream_raw(xref) or b""
+        except Exception:
+            data = pdf_document.xref_object(xref, compressed=True).encode()
+        memo[xref] = hashlib.sha256(data).digest()
+    return memo[xref]
+
+
+def _resolve_references(pdf_document: fitz.Document, text: str, memo: Dict[Any, bytes]) -> str:
+    def digest(match: re.Match) -> str:
+        key, space, xref = match.group(1) or "", match.group(2), int(match.group(3))
+        if key in _SKIPPED_REFERENCES:
+            return match.group(0)
+        return f"{key}{space}<{_object_digest(pdf_document, xref, memo).hex()}>"
+    return _REFERENCE.sub(digest, text)
+
+
+def _object_digest(pdf_document: fitz.Document, xref: int, memo: Dict[Any, bytes]) -> bytes:
+    # Digest of an object's dictionary, with every reference resolved, and of its stream.
+    key = ("object", xref)
+    if key not in memo:
+        # Placeholder for reference cycles, e.g. a form XObject that lists itself as a resource.
+        memo[key] = b"cycle"
+        try:
+            text = pdf_document.xref_object(xref, compressed=True)
+        except Exception:
+            text = ""
+        digest = hashlib.sha256(_resolve_references(pdf_document, text, memo).encode())
+        if pdf_document.xref_is_stream(xref):
+            digest.update(_stream_digest(pdf_document, xref, memo))
+        memo[key] = digest.digest()
+    return memo[key]
+
+
+def page_fingerprint(page: fitz.Page, memo: Optional[Dict[Any, bytes]] = None) -> str:
+    """
+    Cheap signature of everything that affects how a page renders: geometry, the
+    content streams and the data of the fonts, images, form XObjects and annotations
+    it uses. Two pages with equal fingerprints rasterize identically.
+    """
+    if memo is None:
+        memo = {}
+    pdf_document = page.parent
+    digest = hashlib.sha256()
+    digest.update(repr((tuple(page.rect), tuple(page.cropbox), page.rotation)).encode())
+    digest.update(page.read_contents())
+
+    for xref, ext, font_type, basefont, name, encoding, *_ in page.get_fonts(full=True):
+        digest.update(repr((name, basefont, font_type, encoding)).encode())
+        if xref and ext != "n/a":
+            if xref not in memo:
+                memo[xref] = hashlib.sha256(pdf_document.extract_font(xref)[-1] or b"").digest()
+            digest.update(memo[xref])
+    for image in page.get_images(full=True):
+        digest.update(image[7].encode())
+        digest.update(_stream_digest(pdf_document, image[0], memo))
+        if image[1]:
+            digest.update(_stream_digest(pdf_document, image[1], memo))
+    for xref, name, *_ in page.get_xobjects():
+        # Form XObjects carry their own /Resources, hashed along with the stream.
+        digest.update(name.encode())
+        digest.update(_object_digest(pdf_document, xref, memo))
+    for key in _RESOURCE_KEYS:
+        value_type, value = pdf_document.xref_get_key(page.xref, f"Resources/{key}")
+        digest.update(repr((value_type, _resolve_references(pdf_document, value, memo))).encode())
+    for annot in page.annots() or []:
+        digest.update(repr((annot.type[0], tuple(annot.rect), annot.info.get("content"))).encode())
+        ap_type, ap_value = pdf_document.xref_get_key(annot.xref, "AP/N")
+        if ap_type == "xref":
+            digest.update(_object_digest(pdf_document, int(ap_value.split()[0]), memo))
+    return digest.hexdigest()
+
+
+def document_fingerprints(pdf_document: fitz.Document) -> List[str]:
+    memo: Dict[Any, bytes] = {}
+    return [page_fingerprint(page, memo) for page in pdf_document]
@@ -1,12 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk, ImageEnhance, ImageFilter
+from PIL import ImageTk
+import queue
 import threading
 import logging
 import os
 import textwrap
 from .pdf_tool import PDFComparisonTool
-from .utils import resize_image
+from .viewer import PageViewer
+from .cache import default_cache_dir
+
+# Interval at which results from worker threads are applied to the widgets.
+UI_POLL_MS = 30
+# Resize and slider events closer than this are coalesced into one redraw.
+DEBOUNCE_MS = 80
 
 class PDFComparisonGUI:
     def __init__(self, master):
@@ -21,12 +28,18 @@ class PDFComparisonGUI:
         self.style.configure('TLabel', padding=6, background='#f0f0f0')
         self.style.configure('TFrame', background='#f0f0f0')
 
-        self.pdf_tool = PDFComparisonTool()
+        self.pdf_tool = PDFComparisonTool(cache_dir=default_cache_dir())
         self.current_page = 0
         self.pdf1_path = ""
         self.pdf2_path = ""
+        self.comparing = False
+        self._update_job = None
+        # Tk is only touched from its own thread: workers queue callables that process_ui_queue runs.
+        self.ui_queue = queue.Queue()
+        self.viewer = PageViewer(self.pdf_tool, self.on_display_ready)
 
         self.create_widgets()
+        self.process_ui_queue()
     
     def create_widgets(self):
         self.master.grid_rowconfigure(1, weight=1)
@@ -67,12 +80,12 @@ class PDFComparisonGUI:
         self.adjust_frame = ttk.Frame(self.master)
         self.adjust_frame.grid(row=3, column=0, pady=10, sticky='ew')
 
-        self.contrast_slider = ttk.Scale(self.adjust_frame, from_=0, to=2, length=200, command=self.update_image)
+        self.contrast_slider = ttk.Scale(self.adjust_frame, from_=0, to=2, length=200, command=self.schedule_update)
         self.contrast_slider.set(1)
         self.contrast_slider.pack(side=tk.LEFT, padx=10)
         ttk.Label(self.adjust_frame, text="Contraste").pack(side=tk.LEFT)
 
-        self.brightness_slider = ttk.Scale(self.adjust_frame, from_=-50, to=50, length=200, command=self.update_image)
+        self.brightness_slider = ttk.Scale(self.adjust_frame, from_=-50, to=50, length=200, command=self.schedule_update)
         self.brightness_slider.set(0)
         self.brightness_slider.pack(side=tk.LEFT, padx=10)
         ttk.Label(self.adjust_frame, text="Brilho").pack(side=tk.LEFT)
@@ -103,8 +116,27 @@ class PDFComparisonGUI:
         return f"{prefix}:\n{wrapped_filename}"
 
     def on_window_resize(self, event):
-        self.update_image()
+        # <Configure> on the toplevel is also delivered for every child widget.
+        if event.widget is self.master:
+            self.schedule_update()
+
+    def call_in_ui(self, function, *args):
+        self.ui_queue.put((function, args))
 
+    def process_ui_queue(self):
+        try:
+            while True:
+                function, args = self.ui_queue.get_nowait()
+                function(*args)
+        except queue.Empty:
+            pass
+        finally:
+            self.master.after(UI_POLL_MS, self.process_ui_queue)
+
+    def schedule_update(self, _=None):
+        if self._update_job is not None:
+            self.master.after_cancel(self._update_job)
+        self._update_job = self.master.after(DEBOUNCE_MS, self.update_image)
 
     def select_pdf1(self):
         self.pdf1_path = filedialog.askopenfilename(filetypes=[("Arquivos PDF", "*.pdf")])
@@ -121,79 +153,95 @@ class PDFComparisonGUI:
             self.pdf2_button.config(text=button_text)
 
     def start_comparison(self):
+        if self.comparing:
+            return
         if self.pdf1_path and self.pdf2_path:
             self.feedback_label.config(text="Comparando PDFs, aguarde...")
             self.progress_bar['value'] = 0
-            self.master.update_idletasks()
-            comparison_thread = threading.Thread(target=self.compare_pdfs)
+            self.comparing = True
+            self.viewer.invalidate()
+            comparison_thread = threading.Thread(target=self.compare_pdfs, daemon=True)
             comparison_thread.start()
         else:
             messagebox.showerror("Erro", "Por favor, selecione ambos os PDFs primeiro.")
 
     def compare_pdfs(self):
+        # Runs on the comparison thread; every widget update goes through call_in_ui.
         try:
-            self.pdf_tool.process_pdfs(self.pdf1_path, self.pdf2_path, self.update_progress)
-            self.current_page = 0
-            self.update_image()
-            self.feedback_label.config(text="Comparação Completa!")
-            self.progress_bar['value'] = 100
+            self.pdf_tool.process_pdfs(self.pdf1_path, self.pdf2_path, lambda value: self.call_in_ui(self.update_progress, value))
+            self.call_in_ui(self.on_comparison_done)
         except Exception as e:
-            self.feedback_label.config(text=f"Erro: {str(e)}")
             logging.error(f"Erro durante a comparação de PDFs: {str(e)}", exc_info=True)
+            self.call_in_ui(self.on_comparison_failed, str(e))
+
+    def on_comparison_done(self):
+        self.comparing = False
+        self.current_page = 0
+        self.feedback_label.config(text="Comparação Completa!")
+        self.progress_bar['value'] = 100
+        # Slider moves made during the comparison were ignored; apply their final values now.
+        self.pdf_tool.update_comparison_params(
+            threshold=int(self.threshold.get()),
+            color_intensity=self.color_intensity.get()
+        )
+        self.update_image()
+
+    def on_comparison_failed(self, error):
+        self.comparing = False
+        self.feedback_label.config(text=f"Erro: {error}")
 
     def update_progress(self, value):
         self.progress_bar['value'] = value
-        self.master.update_idletasks()
 
     def update_comparison(self, _=None):
-        if hasattr(self, 'pdf1_path') and hasattr(self, 'pdf2_path'):
-            self.pdf_tool.update_comparison_params(
-                threshold=int(self.threshold.get()),
-                color_intensity=self.color_intensity.get()
-            )
-            self.update_image()
+        if self.comparing:
+            return
+        self.pdf_tool.update_comparison_params(
+            threshold=int(self.threshold.get()),
+            color_intensity=self.color_intensity.get()
+        )
+        self.schedule_update()
 
     def update_image(self, _=None):
-        if self.pdf_tool.diff_images:
-            try:
-                img1 = self.pdf_tool.pdf1_images[self.current_page]
-                img2 = self.pdf_tool.get_diff_image(self.current_page)['image']
-
-                if img1 is not None and img2 is not None:
-                    img1 = Image.fromarray(img1.astype('uint8'))
-                    img2 = Image.fromarray(img2.astype('uint8'))
-
-                    img1 = img1.filter(ImageFilter.SHARPEN)
-                    img2 = img2.filter(ImageFilter.SHARPEN)
-
-                    enhancer = ImageEnhance.Contrast(img1)
-                    img1 = enhancer.enhance(self.contrast_slider.get())
-                    enhancer = ImageEnhance.Contrast(img2)
-                    img2 = enhancer.enhance(self.contrast_slider.get())
-
-                    enhancer = ImageEnhance.Brightness(img1)
-                    img1 = enhancer.enhance(1 + self.brightness_slider.get() / 100)
-                    enhancer = ImageEnhance.Brightness(img2)
-                    img2 = enhancer.enhance(1 + self.brightness_slider.get() / 100)
-
-                    max_width = self.image_frame.winfo_width() // 2
-                    max_height = self.image_frame.winfo_height()
-
-                    img1 = resize_image(img1, max_width, max_height)
-                    img2 = resize_image(img2, max_width, max_height)
-
-                    img1 = ImageTk.PhotoImage(img1)
-                    img2 = ImageTk.PhotoImage(img2)
-
-                    self.image_label1.config(image=img1)
-                    self.image_label1.image = img1
-                    self.image_label2.config(image=img2)
-                    self.image_label2.image = img2
+        # Asks the viewer for the current page at the viewport size; on_display_ready shows it.
+        self._update_job = None
+        if self.comparing or not self.pdf_tool.diff_images:
+            return
+        self.page_label.config(text=self.page_text(self.pdf_tool.diff_images[self.current_page]))
+        self.viewer.request(
+            self.current_page,
+            self.image_frame.winfo_width() // 2,
+            self.image_frame.winfo_height(),
+            self.contrast_slider.get(),
+            self.brightness_slider.get(),
+        )
+
+    def on_display_ready(self, request, img1, img2, diff_data):
+        # Called on the viewer thread.
+        self.call_in_ui(self.show_images, request, img1, img2)
+
+    def show_images(self, request, img1, img2):
+        if self.comparing or request.page != self.current_page:
+            return
+        try:
+            img1 = ImageTk.PhotoImage(img1)
+            img2 = ImageTk.PhotoImage(img2)
 
-                    self.page_label.config(text=f"Página: {self.current_page + 1} / {len(self.pdf_tool.diff_images)}")
-            except Exception as e:
-                self.feedback_label.config(text=f"Erro ao atualizar imagem: {str(e)}")
-                logging.error(f"Erro ao atualizar imagem: {str(e)}", exc_info=True)
+            self.image_label1.config(image=img1)
+            self.image_label1.image = img1
+            self.image_label2.config(image=img2)
+            self.image_label2.image = img2
+        except Exception as e:
+            self.feedback_label.config(text=f"Erro ao atualizar imagem: {str(e)}")
+            logging.error(f"Erro ao atualizar imagem: {str(e)}", exc_info=True)
+
+    def page_text(self, diff_data):
+        page_text = f"Página: {self.current_page + 1} / {len(self.pdf_tool.diff_images)}"
+        if diff_data.get('status') == 'inserted':
+            page_text += f" (inserida no PDF 2, p. {diff_data['pdf2_page']})"
+        elif diff_data.get('status') == 'deleted':
+            page_text += f" (ausente no PDF 2, p. {diff_data['pdf1_page']} do PDF 1)"
+        return page_text
 
     def prev_page(self):
         if self.current_page > 0:
@@ -0,0 +1,45 @@
+import os
+import fitz
+from typing import List, Dict, Any, Optional, Tuple
+
+DocumentKey = Tuple[str, int, int]
+
+
+def document_key(pdf_path: str) -> DocumentKey:
+    # Identifies one version of a file: rewriting it changes the size or the mtime.
+    stat = os.stat(pdf_path)
+    return os.path.realpath(pdf_path), stat.st_size, stat.st_mtime_ns
+
+
+class DocumentContent:
+    """
+    Words (with their bounding boxes) and metadata of a PDF, collected from the pages
+    the comparison already loads for rendering and alignment. Each page is parsed once
+    per session; the report then reads everything from here instead of reopening the file.
+    """
+
+    def __init__(self, pdf_document: fitz.Document):
+        self.metadata: Dict[str, Any] = dict(pdf_document.metadata or {})
+        self.words: List[Optional[List[tuple]]] = [None] * len(pdf_document)
+        self._info: Optional[Dict[str, Any]] = None
+
+    def page_words(self, page: fitz.Page) -> List[tuple]:
+        if self.words[page.number] is None:
+            self.words[page.number] = [word[:5] for word in page.get_text("words")]
+        return self.words[page.number]
+
+    def add_words(self, words: Dict[int, List[tuple]]) -> None:
+        # Words extracted elsewhere, e.g. by a worker process, for pages not seen yet.
+        for page_index, page_words in words.items():
+            if self.words[page_index] is None:
+                self.words[page_index] = [tuple(word) for word in page_words]
+
+    def missing_pages(self) -> List[int]:
+        return [page_index for page_index, page_words in enumerate(self.words) if page_words is None]
+
+    def info(self) -> Dict[str, Any]:
+        # The extract_text_and_metadata() result; only valid once every page has its words.
+        if self._info is None:
+            text = "\n".join(" ".join(word[4] for word in page_words) for page_words in self.words)
+            self._info = {"text": text, "words": self.words, "metadata": self.metadata}
+        return self._info
@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import List, Dict, Any, Callable, Iterator, Optional
+
+Sink = Callable[[Dict[str, Any]], None]
+
+
+def current_rss_mb() -> float:
+    # Resident set size right now where /proc is available, otherwise the process peak.
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+class Metrics:
+    """
+    Stage timers, counters and memory high-water mark of a comparison.
+
+    Every finished stage, counter update and completed page is also sent as an event
+    dict to the registered sinks: {'type': 'stage', 'name', 'page', 'start',
+    'duration'}, {'type': 'counter', 'name', 'value'} and {'type': 'page', 'page', 'done',
+    'total', 'rss_mb'}. Times are in seconds relative to the creation of the object.
+    """
+
+    def __init__(self, sinks: Optional[List[Sink]] = None):
+        self.sinks: List[Sink] = list(sinks or [])
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.page_times: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.peak_rss_mb = current_rss_mb()
+
+    def add_sink(self, sink: Sink) -> None:
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink: Sink) -> None:
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    @contextmanager
+    def sink(self, sink: Optional[Sink]) -> Iterator[None]:
+        # Registers the sink for the duration of the block; None is accepted and ignored.
+        if sink is None:
+            yield
+            return
+        self.add_sink(sink)
+        try:
+            yield
+        finally:
+            self.remove_sink(sink)
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        for sink in list(self.sinks):
+            sink(event)
+
+    @contextmanager
+    def stage(self, name: str, page: Optional[int] = None) -> Iterator[None]:
+        """
+        Time the block as stage name. Nested stages inherit the page number of the
+        enclosing one, so per-page timings need the page only on the outer stage.
+        """
+        outer_page = getattr(self._local, 'page', None)
+        if page is None:
+            page = outer_page
+        self._local.page = page
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._local.page = outer_page
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = {'count': 0, 'total': 0.0, 'max': 0.0}
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            if page is not None:
+                self.page_times[page][name] += duration
+            if self.sinks:
+                self._emit({'type': 'stage', 'name': name, 'page': page, 'start': start - self.origin, 'duration': duration})
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+        if self.sinks:
+            self._emit({'type': 'counter', 'name': name, 'value': self.counters[name], 'time': time.perf_counter() - self.origin})
+
+    def sample_memory(self) -> float:
+        rss_mb = current_rss_mb()
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        return rss_mb
+
+    def page_done(self, page: int, done: int, total: int) -> None:
+        # page is the page number just finished, done how many pages are finished so far.
+        rss_mb = self.sample_memory()
+        if self.sinks:
+            self._emit({'type': 'page', 'page': page, 'done': done, 'total': total, 'rss_mb': rss_mb, 'time': time.perf_counter() - self.origin})
+
+    def merge(self, summary: Dict[str, Any]) -> None:
+        # Folds in the summary() of a worker process.
+        for name, stats in summary['stages'].items():
+            own = self.stages.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            own['count'] += stats['count']
+            own['total'] += stats['total']
+            own['max'] = max(own['max'], stats['max'])
+        for name, value in summary['counters'].items():
+            self.counters[name] += value
+        for page, times in summary['pages'].items():
+            for name, duration in times.items():
+                self.page_times[int(page)][name] += duration
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'stages': {name: dict(stats) for name, stats in self.stages.items()},
+            'counters': dict(self.counters),
+            'pages': {page: dict(times) for page, times in sorted(self.page_times.items())},
+            'peak_rss_mb': round(max(self.peak_rss_mb, self.sample_memory()), 1),
+        }
+
+
+def progress_sink(progress_callback: Optional[Callable[[float], None]]) -> Optional[Sink]:
+    # Adapts the percentage progress_callback of the process_* methods to page events.
+    if progress_callback is None:
+        return None
+
+    def sink(event: Dict[str, Any]) -> None:
+        if event['type'] == 'page':
+            progress_callback(event['done'] / event['total'] * 100)
+    return sink
+
+
+class ChromeTrace:
+    """
+    Sink that records the events in the Chrome trace-event format, viewable in
+    chrome://tracing or Perfetto: stages become complete events, counters and the
+    resident memory become counter tracks.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.pid = os.getpid()
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        if event['type'] == 'stage':
+            self.events.append({
+                'name': event['name'], 'cat': 'stage', 'ph': 'X', 'pid': self.pid, 'tid': threading.get_ident(),
+                'ts': event['start'] * 1e6, 'dur': event['duration'] * 1e6,
+                'args': {} if event['page'] is None else {'page': event['page']},
+            })
+        elif event['type'] == 'counter':
+            self.events.append({'name': event['name'], 'ph': 'C', 'pid': self.pid, 'ts': event['time'] * 1e6, 'args': {'value': event['value']}})
+        elif event['type'] == 'page':
+            self.events.append({'name': 'rss_mb', 'ph': 'C', 'pid': self.pid, 'ts': event['time'] * 1e6, 'args': {'value': round(event['rss_mb'], 1)}})
+
+    def write(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as trace_file:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, trace_file)
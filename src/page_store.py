@@ -0,0 +1,120 @@
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+DEFAULT_RAM_BUDGET = 1024 ** 3
+
+
+class StoredPage:
+    """
+    One compared page: handles of the grayscale base plane and of the absdiff cropped
+    to its non-zero area, plus the change mask bit-packed for the last threshold used.
+    """
+
+    __slots__ = ('base', 'diff', 'diff_box', 'shape', 'mask_threshold', 'packed_mask')
+
+    def __init__(self, base: int, diff: Optional[int], diff_box: Tuple[int, int, int, int], shape: Tuple[int, int]):
+        self.base = base
+        self.diff = diff
+        self.diff_box = diff_box
+        self.shape = shape
+        self.mask_threshold: Optional[int] = None
+        self.packed_mask: Optional[np.ndarray] = None
+
+
+class PageStore:
+    """
+    Page planes of an in-memory comparison, kept within a RAM budget.
+
+    Arrays are held in memory until their total size passes ram_budget; the least
+    recently used ones are then appended to an anonymous spill file and read back
+    memory-mapped, so pages not being viewed only occupy the OS page cache. Spilled
+    arrays are read-only.
+    """
+
+    def __init__(self, ram_budget: int = DEFAULT_RAM_BUDGET, spill_dir: Optional[str] = None):
+        self.ram_budget = ram_budget
+        self.spill_dir = spill_dir
+        self._memory: 'OrderedDict[int, np.ndarray]' = OrderedDict()
+        self._spilled: Dict[int, Tuple[int, Tuple[int, ...]]] = {}
+        self._spill_file = None
+        self._spill_size = 0
+        self._next_handle = 0
+        self.memory_bytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def spilled_bytes(self) -> int:
+        return self._spill_size
+
+    def put(self, array: np.ndarray) -> int:
+        with self._lock:
+            handle = self._next_handle
+            self._next_handle += 1
+            self._memory[handle] = np.ascontiguousarray(array, dtype=np.uint8)
+            self.memory_bytes += array.nbytes
+            while self.memory_bytes > self.ram_budget and len(self._memory) > 1:
+                self._spill_oldest()
+            return handle
+
+    def get(self, handle: int) -> np.ndarray:
+        with self._lock:
+            array = self._memory.get(handle)
+            if array is not None:
+                self._memory.move_to_end(handle)
+                return array
+            offset, shape = self._spilled[handle]
+            return np.memmap(self._spill_file, dtype=np.uint8, mode='r', offset=offset, shape=shape)
+
+    def _spill_oldest(self) -> None:
+        handle, array = self._memory.popitem(last=False)
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(dir=self.spill_dir)
+        self._spill_file.seek(self._spill_size)
+        array.tofile(self._spill_file)
+        self._spill_file.flush()
+        self._spilled[handle] = (self._spill_size, array.shape)
+        self._spill_size += array.nbytes
+        self.memory_bytes -= array.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._spilled.clear()
+            self.memory_bytes = 0
+            self._spill_size = 0
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+
+    def add_page(self, base: np.ndarray, diff: Optional[np.ndarray], threshold: int) -> StoredPage:
+        """
+        Store a grayscale base plane and its absdiff against the other page (None for
+        identical pages). Only the bounding box of the non-zero differences is kept.
+        """
+        x, y, w, h = cv2.boundingRect(diff) if diff is not None else (0, 0, 0, 0)
+        diff_handle = self.put(diff[y:y + h, x:x + w]) if w and h else None
+        page = StoredPage(self.put(base), diff_handle, (x, y, w, h), base.shape[:2])
+        self.mask(page, threshold)
+        return page
+
+    def base(self, page: StoredPage) -> np.ndarray:
+        return self.get(page.base)
+
+    def mask(self, page: StoredPage, threshold: int) -> np.ndarray:
+        """
+        Full-size 0/255 change mask of the page. The packed bits are kept per page and
+        rebuilt from the cropped absdiff only when the threshold changes.
+        """
+        x, y, w, h = page.diff_box
+        if page.mask_threshold != threshold:
+            page.packed_mask = np.packbits(self.get(page.diff) > threshold) if page.diff is not None else None
+            page.mask_threshold = threshold
+        mask = np.zeros(page.shape, dtype=np.uint8)
+        if page.packed_mask is not None:
+            mask[y:y + h, x:x + w] = np.unpackbits(page.packed_mask, count=w * h).reshape(h, w) * 255
+        return mask
@@ -0,0 +1,99 @@
+import os
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple
+from .alignment import PagePair
+from .ingest import document_key
+from .metrics import Metrics
+
+
+def default_worker_count() -> int:
+    return os.cpu_count() or 1
+
+
+def split_page_ranges(total_pages: int, workers: int, chunk_size: Optional[int] = None) -> List[range]:
+    """
+    Split the pages into contiguous ranges. By default each worker gets about four
+    chunks so a slow range (image-heavy pages) does not leave the other workers idle.
+    """
+    if total_pages <= 0:
+        return []
+    if chunk_size is None:
+        chunk_size = max(1, -(-total_pages // (workers * 4)))
+    return [range(start, min(start + chunk_size, total_pages)) for start in range(0, total_pages, chunk_size)]
+
+
+def compare_page_range(pdf1_path: str, pdf2_path: str, pairs: List[PagePair], start: int, tool_options: Dict[str, Any],
+                       output_dir: Optional[str] = None, keep_images: bool = False,
+                       pdf_hashes: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                       fingerprints: Optional[Tuple[List[str], List[str]]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Tuple[Dict[int, list], Dict[int, list]]]:
+    # Runs inside a worker process: each worker opens its own fitz documents. The worker's
+    # metrics summary and the words of the pages it parsed are returned with the pages.
+    # pdf_hashes (the render cache keys) and the page fingerprints come from the parent,
+    # which computed them once for the whole comparison.
+    from .pdf_tool import PDFComparisonTool
+
+    tool = PDFComparisonTool.from_worker_options(tool_options)
+
+    results = []
+    for diff_data in tool.iter_page_comparisons(pdf1_path, pdf2_path, output_dir, keep_images, pairs, start, pdf_hashes, fingerprints):
+        if diff_data['image'] is not None:
+            # PNG keeps the payload sent back to the parent process small.
+            _, encoded = cv2.imencode('.png', cv2.cvtColor(diff_data['image'], cv2.COLOR_RGB2BGR))
+            diff_data['image'] = encoded.tobytes()
+        results.append(diff_data)
+    words = tuple(
+        {index: page_words for index, page_words in enumerate(tool.documents[document_key(path)].words) if page_words is not None}
+        if document_key(path) in tool.documents else {}
+        for path in (pdf1_path, pdf2_path)
+    )
+    return results, tool.metrics.summary(), words
+
+
+def decode_diff_image(data: bytes) -> np.ndarray:
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def run_parallel_comparison(pdf1_path: str, pdf2_path: str, pairs: List[PagePair], tool_options: Dict[str, Any],
+                            pdf_hashes: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                            fingerprints: Optional[Tuple[List[str], List[str]]] = None,
+                            workers: Optional[int] = None, output_dir: Optional[str] = None, keep_images: bool = False,
+                            progress_callback: callable = None, chunk_size: Optional[int] = None,
+                            metrics: Optional[Metrics] = None) -> Tuple[List[Dict[str, Any]], Tuple[Dict[int, list], Dict[int, list]]]:
+    """
+    Compare the page pairs across worker processes. Returns the page results in order
+    and the words each document's pages yielded, indexed by page, for the report.
+    """
+    workers = workers or default_worker_count()
+    total_pages = len(pairs)
+    page_ranges = split_page_ranges(total_pages, workers, chunk_size)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+    words = ({}, {})
+    with ProcessPoolExecutor(max_workers=min(workers, max(1, len(page_ranges)))) as executor:
+        futures = [
+            executor.submit(compare_page_range, pdf1_path, pdf2_path, pairs[pages.start:pages.stop], pages.start,
+                            tool_options, output_dir, keep_images, pdf_hashes, fingerprints)
+            for pages in page_ranges
+        ]
+        for future in as_completed(futures):
+            chunk, worker_metrics, worker_words = future.result()
+            results.extend(chunk)
+            words[0].update(worker_words[0])
+            words[1].update(worker_words[1])
+            if metrics is not None:
+                metrics.merge(worker_metrics)
+                for done, diff_data in enumerate(chunk, len(results) - len(chunk) + 1):
+                    metrics.page_done(diff_data['page_number'], done, total_pages)
+            if progress_callback:
+                progress_callback(len(results) / total_pages * 100)
+
+    results.sort(key=lambda diff_data: diff_data['page_number'])
+    for diff_data in results:
+        if diff_data['image'] is not None:
+            diff_data['image'] = decode_diff_image(diff_data['image'])
+    return results, words
@@ -3,10 +3,21 @@ import numpy as np
 import cv2
 import fitz
 import logging
-from typing import List, Dict, Any
-from difflib import SequenceMatcher
-from functools import lru_cache
+import textwrap
+import threading
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from PIL import Image
+from .cache import RenderCache, DEFAULT_CACHE_MAX_BYTES, file_digest
+from .fingerprint import document_fingerprints, page_fingerprint
+from .tiled import compare_pages_tiled, FINE_ZOOM
+from .vector_diff import compare_pages_vector, VECTOR_TOLERANCE
+from .text_diff import diff_pages, match_tokens, similarity
+from .alignment import PagePair, PageSignatures, align_pages, index_pairs
+from .diff_kernel import DiffKernel
+from .metrics import Metrics, progress_sink
+from .ingest import DocumentContent, DocumentKey, document_key
+from .page_store import PageStore, StoredPage, DEFAULT_RAM_BUDGET
+from .session import ComparisonStore, pack_mask, unpack_mask
 
 try:
     from pillow_simd import Image as SIMDImage
@@ -14,115 +25,663 @@ except ImportError:
     SIMDImage = Image
 
 class PDFComparisonTool:
-    def __init__(self):
-        self.pdf1_images: List[np.ndarray] = []
-        self.pdf2_images: List[np.ndarray] = []
+    def __init__(self, cache_dir: Optional[str] = None, cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES, ram_budget: int = DEFAULT_RAM_BUDGET):
         self.diff_images: List[Dict[str, Any]] = []
         self.threshold: int = 30
         self.color_intensity: float = 0.3
-        self.cache: Dict[str, Any] = {}
+        # Per-page grayscale planes and packed change masks, held in page_store; overlays
+        # are derived from them on demand and pages past ram_budget spill to a memory-mapped file.
+        self.diff_maps: List[StoredPage] = []
+        self.page_store = PageStore(ram_budget)
+        self._overlay: Optional[Tuple[int, Tuple[int, float], np.ndarray]] = None
+        # The overlay is built in the kernel's shared buffers; the GUI builds it off the Tk thread.
+        self._overlay_lock = threading.Lock()
+        self.render_zoom: float = 2.0
+        self.kernel = DiffKernel()
+        self.max_reported_text_changes: int = 50
+        # Align page sequences so inserted or deleted pages do not shift every later page.
+        self.page_alignment: bool = True
+        self.page_pairs: List[PagePair] = []
+        # Where the diff images of the current comparison were last written, for the report.
+        self.images_dir: Optional[str] = None
+        self.render_cache: Optional[RenderCache] = RenderCache(cache_dir, cache_max_bytes) if cache_dir else None
+        # Stage timings and counters of the current comparison; sinks receive them as events.
+        self.metrics = Metrics()
+        # Words and metadata gathered while comparing, so the report does not re-parse the PDFs.
+        self.documents: Dict[DocumentKey, DocumentContent] = {}
+        self._text_comparison: Optional[Tuple[DocumentKey, DocumentKey, Dict[str, Any]]] = None
 
-    @lru_cache(maxsize=32)
-    def convert_pdf_to_images(self, pdf_path: str, zoom_x: float = 2.0, zoom_y: float = 2.0) -> List[np.ndarray]:
+    def worker_options(self) -> Dict[str, Any]:
+        # Settings needed to rebuild an equivalent tool inside a worker process.
+        return {
+            'threshold': self.threshold,
+            'color_intensity': self.color_intensity,
+            'page_alignment': self.page_alignment,
+            'render_zoom': self.render_zoom,
+            'cache_dir': self.render_cache.cache_dir if self.render_cache else None,
+            'cache_max_bytes': self.render_cache.max_bytes if self.render_cache else DEFAULT_CACHE_MAX_BYTES,
+        }
+
+    @classmethod
+    def from_worker_options(cls, options: Dict[str, Any]) -> 'PDFComparisonTool':
+        tool = cls(cache_dir=options['cache_dir'], cache_max_bytes=options['cache_max_bytes'])
+        tool.threshold = options['threshold']
+        tool.color_intensity = options['color_intensity']
+        tool.page_alignment = options['page_alignment']
+        tool.render_zoom = options['render_zoom']
+        return tool
+
+    def convert_pdf_to_images(self, pdf_path: str, zoom_x: float = 2.0, zoom_y: float = 2.0, skip_pages: Optional[set] = None) -> List[Optional[np.ndarray]]:
         images = []
-        pdf_document = fitz.open(pdf_path)
-        for page in pdf_document:
+        pdf_hash = self.document_hash(pdf_path)
+        with fitz.open(pdf_path) as pdf_document:
+            for page in pdf_document:
+                if skip_pages and page.number in skip_pages:
+                    images.append(None)
+                    continue
+                images.append(self.render_cached_page(pdf_document, page.number, pdf_hash, zoom_x, zoom_y, page))
+        return images
+
+    def document_content(self, pdf_document: fitz.Document) -> DocumentContent:
+        if not pdf_document.name:
+            return DocumentContent(pdf_document)
+        key = document_key(pdf_document.name)
+        if key not in self.documents:
+            self.documents[key] = DocumentContent(pdf_document)
+        return self.documents[key]
+
+    def start_session(self, pdf1_path: str, pdf2_path: str) -> None:
+        # Keeps the extracted content of the two documents being compared and drops the rest.
+        keys = {document_key(pdf1_path), document_key(pdf2_path)}
+        self.documents = {key: content for key, content in self.documents.items() if key in keys}
+
+    def page_words(self, page: fitz.Page) -> List[tuple]:
+        with self.metrics.stage('text_extraction'):
+            return self.document_content(page.parent).page_words(page)
+
+    def page_fingerprints(self, pdf_path: str) -> List[str]:
+        with fitz.open(pdf_path) as pdf_document:
+            return document_fingerprints(pdf_document)
+
+    def identical_pages(self, pairs: List[PagePair], pdf1_fingerprints: List[str], pdf2_fingerprints: List[str]) -> Dict[int, int]:
+        # Maps the pdf2 index of each matched pair with equal fingerprints to its pdf1 index.
+        return {
+            j: i for i, j in pairs
+            if i is not None and j is not None and pdf1_fingerprints[i] == pdf2_fingerprints[j]
+        }
+
+    def pair_pages(self, pdf1_document: fitz.Document, pdf2_document: fitz.Document, pdf1_fingerprints: List[str], pdf2_fingerprints: List[str]) -> List[PagePair]:
+        if not self.page_alignment:
+            return index_pairs(len(pdf1_document), len(pdf2_document))
+        return align_pages(
+            PageSignatures(pdf1_document, pdf1_fingerprints, self.document_content(pdf1_document)),
+            PageSignatures(pdf2_document, pdf2_fingerprints, self.document_content(pdf2_document)),
+        )
+
+    def pair_documents(self, pdf1_document: fitz.Document, pdf2_document: fitz.Document, mismatch_callback: callable = None) -> Tuple[List[PagePair], List[str], List[str]]:
+        self.check_page_counts(len(pdf1_document), len(pdf2_document), mismatch_callback)
+        with self.metrics.stage('fingerprint'):
+            pdf1_fingerprints = document_fingerprints(pdf1_document)
+            pdf2_fingerprints = document_fingerprints(pdf2_document)
+        with self.metrics.stage('align'):
+            pairs = self.pair_pages(pdf1_document, pdf2_document, pdf1_fingerprints, pdf2_fingerprints)
+        return pairs, pdf1_fingerprints, pdf2_fingerprints
+
+    def prepare_page_pairs(self, pdf1_path: str, pdf2_path: str, mismatch_callback: callable = None) -> Tuple[List[PagePair], List[str], List[str]]:
+        with fitz.open(pdf1_path) as pdf1_document, fitz.open(pdf2_path) as pdf2_document:
+            return self.pair_documents(pdf1_document, pdf2_document, mismatch_callback)
+
+    def check_page_counts(self, pdf1_pages: int, pdf2_pages: int, mismatch_callback: callable = None) -> None:
+        if pdf1_pages != pdf2_pages:
+            logging.warning(f"Os PDFs têm números diferentes de páginas. PDF1: {pdf1_pages}, PDF2: {pdf2_pages}")
+            if mismatch_callback:
+                mismatch_callback(pdf1_pages, pdf2_pages)
+
+    def page_entry(self, position: int, pdf1_index: Optional[int], pdf2_index: Optional[int]) -> Dict[str, Any]:
+        if pdf1_index is not None and pdf2_index is not None:
+            status = 'matched'
+        else:
+            status = 'deleted' if pdf2_index is None else 'inserted'
+        return {
+            'image': None,
+            'page_number': position + 1,
+            'pdf1_page': None if pdf1_index is None else pdf1_index + 1,
+            'pdf2_page': None if pdf2_index is None else pdf2_index + 1,
+            'status': status,
+            'is_extra_page': status != 'matched',
+            'identical': False,
+        }
+
+    def document_hash(self, pdf_path: str) -> Optional[str]:
+        return self.render_cache.file_hash(pdf_path) if self.render_cache else None
+
+    def document_hashes(self, pdf1_path: str, pdf2_path: str) -> Tuple[Optional[str], Optional[str]]:
+        return self.document_hash(pdf1_path), self.document_hash(pdf2_path)
+
+    def render_cached_page(self, pdf_document: fitz.Document, page_index: int, pdf_hash: Optional[str], zoom_x: float = 2.0, zoom_y: float = 2.0, page: Optional[fitz.Page] = None) -> np.ndarray:
+        # Pass the page when it is already loaded, so it is not parsed a second time.
+        if page is None:
+            page = pdf_document[page_index]
+        if self.render_cache is None or pdf_hash is None:
+            return self.render_page(page, zoom_x, zoom_y)
+        key = self.render_cache.page_key(pdf_hash, page_index, zoom_x, zoom_y)
+        with self.metrics.stage('cache_lookup'):
+            image = self.render_cache.get(key)
+        if image is None:
+            self.metrics.count('cache_misses')
+            image = self.render_page(page, zoom_x, zoom_y)
+            with self.metrics.stage('cache_store'):
+                self.render_cache.put(key, image)
+        else:
+            self.metrics.count('cache_hits')
+        return image
+
+    def render_enhanced(self, page: fitz.Page, pdf_hash: Optional[str]) -> np.ndarray:
+        return self.enhance_image(self.render_cached_page(page.parent, page.number, pdf_hash, self.render_zoom, self.render_zoom, page))
+
+    def render_page(self, page: fitz.Page, zoom_x: float = 2.0, zoom_y: float = 2.0) -> np.ndarray:
+        with self.metrics.stage('render'):
             pix = page.get_pixmap(matrix=fitz.Matrix(zoom_x, zoom_y))
             img = SIMDImage.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            images.append(np.array(img))
-        pdf_document.close()
-        return images
+            image = np.array(img)
+        self.metrics.count('pages_rendered')
+        return image
 
     def enhance_image(self, image: np.ndarray) -> np.ndarray:
-        lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-        cl = clahe.apply(l)
-        limg = cv2.merge((cl,a,b))
-        enhanced = cv2.cvtColor(limg, cv2.COLOR_LAB2RGB)
+        with self.metrics.stage('enhance'):
+            lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
+            l, a, b = cv2.split(lab)
+            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+            cl = clahe.apply(l)
+            limg = cv2.merge((cl,a,b))
+            enhanced = cv2.cvtColor(limg, cv2.COLOR_LAB2RGB)
         return enhanced
 
     def update_comparison_params(self, threshold: int, color_intensity: float) -> None:
         self.threshold = threshold
         self.color_intensity = color_intensity
-        self.recompute_diff_images()
-
-    def recompute_diff_images(self) -> None:
-        self.diff_images = [
-            {
-                'image': self.compare_images(img1, img2),
-                'page_number': i + 1,
-                'is_extra_page': i >= min(len(self.pdf1_images), len(self.pdf2_images))
-            }
-            for i, (img1, img2) in enumerate(zip(self.pdf1_images, self.pdf2_images))
-        ]
+        # The absdiff maps do not depend on these parameters; only the overlay is invalidated.
+        self._overlay = None
+
+    def clear_pages(self) -> None:
+        self.diff_maps = []
+        self.diff_images = []
+        self._overlay = None
+        self.page_store.clear()
+
+    def append_diff_entry(self, position: int, pdf1_index: Optional[int], pdf2_index: Optional[int], img1: Optional[np.ndarray], img2: Optional[np.ndarray]) -> None:
+        diff_data = self.page_entry(position, pdf1_index, pdf2_index)
+        # The same raster is passed for pages whose fingerprints match; those are not diffed.
+        if img1 is img2:
+            base, diff = cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY), None
+            histogram = np.zeros(256, dtype=np.int64)
+            histogram[0] = base.shape[0] * base.shape[1]
+            diff_data['identical'] = True
+        else:
+            if img1 is None:
+                # An inserted page is shown over itself and compared against a blank page.
+                img1, img2 = img2, None
+            with self.metrics.stage('diff'):
+                base, diff = self.compute_gray_diff(img1, img2)
+                histogram = cv2.calcHist([diff], [0], None, [256], [0, 256]).ravel().astype(np.int64)
+        diff_data['histogram'] = histogram
+        self.diff_maps.append(self.page_store.add_page(base, diff, self.threshold))
+        self.diff_images.append(diff_data)
+
+    def compute_gray_diff(self, img1: np.ndarray, img2: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        # Grayscale absdiff of the two rasters at a common size; a missing second page is a blank one.
+        gray1 = cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY)
+        if img2 is None:
+            return gray1, cv2.absdiff(gray1, np.full_like(gray1, 255))
+        gray2 = cv2.cvtColor(img2, cv2.COLOR_RGB2GRAY)
+        height = max(gray1.shape[0], gray2.shape[0])
+        width = max(gray1.shape[1], gray2.shape[1])
+        if gray1.shape != (height, width):
+            gray1 = cv2.resize(gray1, (width, height))
+        if gray2.shape != (height, width):
+            gray2 = cv2.resize(gray2, (width, height))
+        return gray1, cv2.absdiff(gray1, gray2)
 
     def compare_images(self, img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
-        height = max(img1.shape[0], img2.shape[0])
-        width = max(img1.shape[1], img2.shape[1])
-        
-        img1_resized = cv2.resize(img1, (width, height))
-        img2_resized = cv2.resize(img2, (width, height))
+        # The kernel's buffers are reused between calls; only the returned overlay is new.
+        base, stats = self.kernel.diff(img1, img2, self.threshold)
+        return self.kernel.colorize(base, self.color_intensity, stats['changed_boxes'], reuse=False)
 
-        gray1 = cv2.cvtColor(img1_resized, cv2.COLOR_RGB2GRAY)
-        gray2 = cv2.cvtColor(img2_resized, cv2.COLOR_RGB2GRAY)
+    def boxes_to_points(self, boxes: List[Tuple[int, int, int, int]]) -> List[Tuple[float, float, float, float]]:
+        # Raster boxes are reported in PDF points, like the tiled comparison.
+        return [tuple(v / self.render_zoom for v in box) for box in boxes]
 
-        diff = cv2.absdiff(gray1, gray2)
-        _, thresh = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+    def process_pdfs(self, pdf1_path: str, pdf2_path: str, progress_callback: callable = None, mismatch_callback: callable = None) -> None:
+        self.metrics.reset()
+        self.start_session(pdf1_path, pdf2_path)
+        pdf1_hash = self.document_hash(pdf1_path)
+        pdf2_hash = self.document_hash(pdf2_path)
+        # One pass over both documents: each page is loaded once for its raster and its words.
+        with self.metrics.sink(progress_sink(progress_callback)), \
+                fitz.open(pdf1_path) as pdf1_document, fitz.open(pdf2_path) as pdf2_document:
+            pairs, pdf1_fingerprints, pdf2_fingerprints = self.pair_documents(pdf1_document, pdf2_document, mismatch_callback)
+            identical = self.identical_pages(pairs, pdf1_fingerprints, pdf2_fingerprints)
+            self.page_pairs = pairs
+            self.images_dir = None
+            self.clear_pages()
 
-        result = np.zeros_like(img1_resized)
-        result[thresh == 0] = [0, 255, 0]
-        result[thresh != 0] = [0, 0, 255]
+            total_pages = len(pairs)
+            # Only the current pair is held in colour; the store keeps the compact planes.
+            for position, (i, j) in enumerate(pairs):
+                with self.metrics.stage('page', page=position + 1):
+                    img1 = img2 = None
+                    if i is not None:
+                        page1 = pdf1_document[i]
+                        self.page_words(page1)
+                        img1 = self.render_enhanced(page1, pdf1_hash)
+                    if j is not None:
+                        page2 = pdf2_document[j]
+                        self.page_words(page2)
+                        if j in identical:
+                            self.metrics.count('identical_pages_skipped')
+                            img2 = img1
+                        else:
+                            img2 = self.render_enhanced(page2, pdf2_hash)
+                    self.append_diff_entry(position, i, j, img1, img2)
+                    del img1, img2
+                self.metrics.page_done(position + 1, position + 1, total_pages)
+            self.metrics.count('spilled_bytes', self.page_store.spilled_bytes)
 
-        alpha = 1 - self.color_intensity
-        result = cv2.addWeighted(img1_resized, alpha, result, 1 - alpha, 0)
+    def iter_page_comparisons(self, pdf1_path: str, pdf2_path: str, output_dir: Optional[str] = None, keep_images: bool = False, pairs: Optional[List[PagePair]] = None, start: int = 0,
+                              pdf_hashes: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                              fingerprints: Optional[Tuple[List[str], List[str]]] = None) -> Iterator[Dict[str, Any]]:
+        # Walks both documents in lockstep so only the current page pair is held in memory.
+        # Workers get pdf_hashes and the page fingerprints from the parent, which computed
+        # them while pairing; without fingerprints, only the pages visited are fingerprinted.
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        pdf1_hash, pdf2_hash = pdf_hashes or self.document_hashes(pdf1_path, pdf2_path)
+        pdf1_document = fitz.open(pdf1_path)
+        pdf2_document = fitz.open(pdf2_path)
+        try:
+            if pairs is None:
+                fingerprints = fingerprints or (document_fingerprints(pdf1_document), document_fingerprints(pdf2_document))
+                pairs = self.pair_pages(pdf1_document, pdf2_document, *fingerprints)
+            fingerprint_memo1: Dict[int, bytes] = {}
+            fingerprint_memo2: Dict[int, bytes] = {}
+            for position, (i, j) in enumerate(pairs, start):
+                # The page is yielded outside the timed block so the consumer's time is not counted.
+                with self.metrics.stage('page', page=position + 1):
+                    diff_data = self.page_entry(position, i, j)
+                    page1 = pdf1_document[i] if i is not None else None
+                    page2 = pdf2_document[j] if j is not None else None
+                    for page in (page1, page2):
+                        if page is not None:
+                            self.page_words(page)
+                    if page1 is None or page2 is None:
+                        identical = False
+                    elif fingerprints:
+                        identical = fingerprints[0][i] == fingerprints[1][j]
+                    else:
+                        identical = page_fingerprint(page1, fingerprint_memo1) == page_fingerprint(page2, fingerprint_memo2)
+                    if identical:
+                        self.metrics.count('identical_pages_skipped')
+                        self._identical_page_comparison(diff_data, page1, pdf1_hash, output_dir, keep_images)
+                    else:
+                        self._raster_page_comparison(diff_data, page1, pdf1_hash, page2, pdf2_hash, output_dir, keep_images)
+                yield diff_data
+        finally:
+            pdf1_document.close()
+            pdf2_document.close()
 
-        return result
+    def _raster_page_comparison(self, diff_data: Dict[str, Any], page1: Optional[fitz.Page], pdf1_hash: Optional[str],
+                                page2: Optional[fitz.Page], pdf2_hash: Optional[str], output_dir: Optional[str], keep_images: bool) -> Dict[str, Any]:
+        img1 = self.render_enhanced(page1, pdf1_hash) if page1 is not None else None
+        img2 = self.render_enhanced(page2, pdf2_hash) if page2 is not None else None
+        # A page missing from one document is shown over itself and compared against a blank page.
+        if img1 is None:
+            img1, img2 = img2, None
+        if img2 is None:
+            img2 = np.full_like(img1, 255)
 
-    def process_pdfs(self, pdf1_path: str, pdf2_path: str, progress_callback: callable = None, mismatch_callback: callable = None) -> None:
-        self.pdf1_images = list(map(self.enhance_image, self.convert_pdf_to_images(pdf1_path)))
-        self.pdf2_images = list(map(self.enhance_image, self.convert_pdf_to_images(pdf2_path)))
+        # The kernel computes the mask and the page statistics in its reusable buffers.
+        with self.metrics.stage('diff'):
+            img1_resized, stats = self.kernel.diff(img1, img2, self.threshold)
+        del img1, img2
+        diff_data['has_differences'] = stats['has_differences']
+        diff_data['changed_pixels'] = stats['changed_pixels']
+        diff_data['changed_boxes'] = self.boxes_to_points(stats['changed_boxes'])
+        if output_dir or keep_images:
+            with self.metrics.stage('colorize'):
+                diff_image = self.kernel.colorize(img1_resized, self.color_intensity, stats['changed_boxes'])
+            if output_dir:
+                self.save_diff_image(diff_image, os.path.join(output_dir, f"diff_page_{diff_data['page_number']}.png"))
+            if keep_images:
+                diff_data['image'] = diff_image.copy()
+        return diff_data
 
-        min_pages = min(len(self.pdf1_images), len(self.pdf2_images))
-        total_pages = max(len(self.pdf1_images), len(self.pdf2_images))
+    def _identical_page_comparison(self, diff_data: Dict[str, Any], page: fitz.Page, pdf_hash: Optional[str], output_dir: Optional[str], keep_images: bool) -> Dict[str, Any]:
+        diff_data['identical'] = True
+        diff_data['has_differences'] = False
+        diff_data['changed_pixels'] = 0
+        diff_data['changed_boxes'] = []
+        # Only the overlay needs a raster; the second document's page is never rendered.
+        if output_dir or keep_images:
+            img1 = self.render_enhanced(page, pdf_hash)
+            diff_image = self.kernel.colorize(img1, self.color_intensity, boxes=[])
+            if output_dir:
+                self.save_diff_image(diff_image, os.path.join(output_dir, f"diff_page_{diff_data['page_number']}.png"))
+            if keep_images:
+                diff_data['image'] = diff_image.copy()
+        return diff_data
 
-        if len(self.pdf1_images) != len(self.pdf2_images):
-            logging.warning(f"Os PDFs têm números diferentes de páginas. PDF1: {len(self.pdf1_images)}, PDF2: {len(self.pdf2_images)}")
-            if mismatch_callback:
-                mismatch_callback(len(self.pdf1_images), len(self.pdf2_images))
+    def process_pdfs_streaming(self, pdf1_path: str, pdf2_path: str, output_dir: Optional[str] = None, progress_callback: callable = None, mismatch_callback: callable = None) -> List[Dict[str, Any]]:
+        self.metrics.reset()
+        self.start_session(pdf1_path, pdf2_path)
+        with self.metrics.sink(progress_sink(progress_callback)):
+            pairs, pdf1_fingerprints, pdf2_fingerprints = self.prepare_page_pairs(pdf1_path, pdf2_path, mismatch_callback)
+            self.page_pairs = pairs
+            total_pages = len(pairs)
+
+            # Only per-page summaries are retained; page rasters are released as soon as they are compared.
+            self.images_dir = output_dir
+            self.clear_pages()
+            for diff_data in self.iter_page_comparisons(pdf1_path, pdf2_path, output_dir, pairs=pairs,
+                                                        fingerprints=(pdf1_fingerprints, pdf2_fingerprints)):
+                self.diff_images.append(diff_data)
+                self.metrics.page_done(diff_data['page_number'], len(self.diff_images), total_pages)
+        return self.diff_images
 
-        self.recompute_diff_images()
+    def process_pdfs_incremental(self, pdf1_path: str, pdf2_path: str, store: ComparisonStore, output_dir: Optional[str] = None, progress_callback: callable = None, mismatch_callback: callable = None) -> List[Dict[str, Any]]:
+        """
+        Streaming comparison backed by a ComparisonStore. Page pairs already diffed with
+        the same settings, in this or any earlier comparison, are read from the store
+        instead of being rendered; new results, fingerprints and page words are added to
+        it. The session is left as after process_pdfs_streaming, so the report combines
+        stored and new results.
+        """
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.metrics.reset()
+        self.start_session(pdf1_path, pdf2_path)
+        self.images_dir = output_dir
+        self.clear_pages()
+        pdf1_hash = file_digest(pdf1_path)
+        pdf2_hash = file_digest(pdf2_path)
+        with self.metrics.sink(progress_sink(progress_callback)), \
+                fitz.open(pdf1_path) as pdf1_document, fitz.open(pdf2_path) as pdf2_document:
+            self.check_page_counts(len(pdf1_document), len(pdf2_document), mismatch_callback)
+            documents = (pdf1_document, pdf2_document)
+            fingerprints = (self._stored_fingerprints(store, pdf1_hash, pdf1_document), self._stored_fingerprints(store, pdf2_hash, pdf2_document))
+            contents = (self.document_content(pdf1_document), self.document_content(pdf2_document))
+            for content, doc_fingerprints in zip(contents, fingerprints):
+                for page_index in content.missing_pages():
+                    words = store.page_words(doc_fingerprints[page_index])
+                    if words is not None:
+                        content.words[page_index] = words
+            stored_words = tuple(set(range(len(content.words))) - set(content.missing_pages()) for content in contents)
 
-        if progress_callback:
-            for i in range(total_pages):
-                progress_callback((i + 1) / total_pages * 100)
+            pairs = store.alignment(pdf1_hash, pdf2_hash, self.page_alignment)
+            if pairs is None:
+                with self.metrics.stage('align'):
+                    pairs = self.pair_pages(pdf1_document, pdf2_document, fingerprints[0], fingerprints[1])
+                store.put_alignment(pdf1_hash, pdf2_hash, self.page_alignment, pairs)
+            self.page_pairs = pairs
+            # The render cache is keyed by the same file hash.
+            render_hashes = (pdf1_hash, pdf2_hash) if self.render_cache else (None, None)
+
+            total_pages = len(pairs)
+            for position, (i, j) in enumerate(pairs):
+                with self.metrics.stage('page', page=position + 1):
+                    diff_data = self.page_entry(position, i, j)
+                    indices = (i, j)
+                    pages = [None, None]
+                    for side in (0, 1):
+                        if indices[side] is not None and contents[side].words[indices[side]] is None:
+                            pages[side] = documents[side][indices[side]]
+                            self.page_words(pages[side])
+                    fingerprint1 = fingerprints[0][i] if i is not None else None
+                    fingerprint2 = fingerprints[1][j] if j is not None else None
+                    if fingerprint1 is not None and fingerprint1 == fingerprint2:
+                        self.metrics.count('identical_pages_skipped')
+                        self._identical_page_comparison(diff_data, pages[0] or pdf1_document[i], render_hashes[0], output_dir, False)
+                    else:
+                        key = store.pair_key(fingerprint1, fingerprint2, self.threshold, self.render_zoom)
+                        record = store.pair(key)
+                        if record is None:
+                            self.metrics.count('pairs_compared')
+                            page1 = pages[0] or (pdf1_document[i] if i is not None else None)
+                            page2 = pages[1] or (pdf2_document[j] if j is not None else None)
+                            self._raster_page_comparison(diff_data, page1, render_hashes[0], page2, render_hashes[1], output_dir, False)
+                            # The kernel still holds the change mask of the pair just diffed.
+                            stats = {name: diff_data[name] for name in ('has_differences', 'changed_pixels', 'changed_boxes')}
+                            store.put_pair(key, stats, pack_mask(self.kernel.mask) if diff_data['has_differences'] else None)
+                        else:
+                            self.metrics.count('pairs_reused')
+                            diff_data['has_differences'] = record['has_differences']
+                            diff_data['changed_pixels'] = record['changed_pixels']
+                            diff_data['changed_boxes'] = [tuple(box) for box in record['changed_boxes']]
+                            if output_dir:
+                                # The overlay is drawn on the pdf1 page, or on the pdf2 page for inserted pages.
+                                side = 0 if i is not None else 1
+                                page = pages[side] or documents[side][indices[side]]
+                                self._save_stored_overlay(diff_data, page, render_hashes[side], record['mask'], output_dir)
+                    self.diff_images.append(diff_data)
+                self.metrics.page_done(position + 1, position + 1, total_pages)
+
+            for content, doc_fingerprints, known in zip(contents, fingerprints, stored_words):
+                for page_index, words in enumerate(content.words):
+                    if words is not None and page_index not in known:
+                        store.put_page_words(doc_fingerprints[page_index], words)
+        return self.diff_images
+
+    def _stored_fingerprints(self, store: ComparisonStore, file_hash: str, pdf_document: fitz.Document) -> List[str]:
+        record = store.document(file_hash)
+        if record is not None and len(record['fingerprints']) == len(pdf_document):
+            return record['fingerprints']
+        with self.metrics.stage('fingerprint'):
+            fingerprints = document_fingerprints(pdf_document)
+        store.put_document(file_hash, fingerprints, dict(pdf_document.metadata or {}))
+        return fingerprints
+
+    def _save_stored_overlay(self, diff_data: Dict[str, Any], page: fitz.Page, pdf_hash: Optional[str], mask_data: Optional[Dict[str, Any]], output_dir: str) -> None:
+        # Rebuilds the overlay of a stored pair from the base page and the stored change mask.
+        base = self.render_enhanced(page, pdf_hash)
+        mask = unpack_mask(mask_data) if mask_data else np.zeros(base.shape[:2], dtype=np.uint8)
+        if base.shape[:2] != mask.shape:
+            base = cv2.resize(base, (mask.shape[1], mask.shape[0]))
+        boxes = self.kernel.threshold(mask, 0)['changed_boxes'] if mask_data else []
+        with self.metrics.stage('colorize'):
+            diff_image = self.kernel.colorize(base, self.color_intensity, boxes, mask=mask)
+        self.save_diff_image(diff_image, os.path.join(output_dir, f"diff_page_{diff_data['page_number']}.png"))
+
+    def process_pdfs_parallel(self, pdf1_path: str, pdf2_path: str, workers: Optional[int] = None, output_dir: Optional[str] = None, keep_images: bool = False, progress_callback: callable = None, mismatch_callback: callable = None) -> List[Dict[str, Any]]:
+        from .parallel import run_parallel_comparison
+
+        self.metrics.reset()
+        self.start_session(pdf1_path, pdf2_path)
+        with self.metrics.sink(progress_sink(progress_callback)):
+            pairs, pdf1_fingerprints, pdf2_fingerprints = self.prepare_page_pairs(pdf1_path, pdf2_path, mismatch_callback)
+            self.page_pairs = pairs
+
+            self.images_dir = output_dir
+            self.clear_pages()
+            self.diff_images, words = run_parallel_comparison(
+                pdf1_path, pdf2_path, pairs,
+                tool_options=self.worker_options(),
+                pdf_hashes=self.document_hashes(pdf1_path, pdf2_path),
+                fingerprints=(pdf1_fingerprints, pdf2_fingerprints),
+                workers=workers,
+                output_dir=output_dir,
+                keep_images=keep_images,
+                metrics=self.metrics,
+            )
+            # The workers parsed every page; keep their words for the report.
+            with fitz.open(pdf1_path) as pdf1_document, fitz.open(pdf2_path) as pdf2_document:
+                self.document_content(pdf1_document).add_words(words[0])
+                self.document_content(pdf2_document).add_words(words[1])
+        return self.diff_images
+
+    def process_pdfs_tiled(self, pdf1_path: str, pdf2_path: str, output_dir: Optional[str] = None, coarse_zoom: float = 0.5, fine_zoom: float = FINE_ZOOM, tile_size: int = 16, progress_callback: callable = None, mismatch_callback: callable = None) -> List[Dict[str, Any]]:
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.images_dir = output_dir
+        self.clear_pages()
+
+        self.metrics.reset()
+        self.start_session(pdf1_path, pdf2_path)
+        with self.metrics.sink(progress_sink(progress_callback)), \
+                fitz.open(pdf1_path) as pdf1_document, fitz.open(pdf2_path) as pdf2_document:
+            self.page_pairs, pdf1_fingerprints, pdf2_fingerprints = self.pair_documents(pdf1_document, pdf2_document, mismatch_callback)
+            total_pages = len(self.page_pairs)
+
+            for position, (i, j) in enumerate(self.page_pairs):
+                with self.metrics.stage('page', page=position + 1):
+                    diff_data = self.page_entry(position, i, j)
+                    diff_data['changed_boxes'] = []
+                    diff_data['patches'] = []
+                    page1 = pdf1_document[i] if i is not None else None
+                    page2 = pdf2_document[j] if j is not None else None
+                    for page in (page1, page2):
+                        if page is not None:
+                            self.page_words(page)
+                    if diff_data['is_extra_page']:
+                        page = page1 if page1 is not None else page2
+                        diff_data['changed_boxes'] = [tuple(page.rect)]
+                    elif pdf1_fingerprints[i] == pdf2_fingerprints[j]:
+                        self.metrics.count('identical_pages_skipped')
+                        diff_data['identical'] = True
+                    else:
+                        with self.metrics.stage('tiled_diff'):
+                            diff_data.update(compare_pages_tiled(
+                                page1, page2, self.threshold, self.color_intensity,
+                                coarse_zoom=coarse_zoom, fine_zoom=fine_zoom, tile_size=tile_size))
+                        self.metrics.count('regions_rendered', len(diff_data['patches']))
+                    diff_data['has_differences'] = bool(diff_data['changed_boxes'])
+                    diff_data['changed_pixels'] = sum(patch['changed_pixels'] for patch in diff_data['patches'])
+
+                    if output_dir:
+                        for k, patch in enumerate(diff_data['patches']):
+                            self.save_diff_image(patch['image'], os.path.join(output_dir, f"diff_page_{position+1}_region_{k+1}.png"))
+                    self.diff_images.append(diff_data)
+                self.metrics.page_done(position + 1, position + 1, total_pages)
+        return self.diff_images
+
+    def process_pdfs_vector(self, pdf1_path: str, pdf2_path: str, output_dir: Optional[str] = None, tolerance: float = VECTOR_TOLERANCE, progress_callback: callable = None, mismatch_callback: callable = None) -> List[Dict[str, Any]]:
+        """
+        Object-level alternative to the raster comparison for text and line-art documents:
+        text spans, vector paths and image placements are matched geometrically and only
+        replaced images are rasterized. Each entry gets the added, removed, moved and
+        changed objects in 'vector_changes'; changed_pixels only counts image pixels.
+        """
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.images_dir = output_dir
+        self.clear_pages()
+
+        self.metrics.reset()
+        self.start_session(pdf1_path, pdf2_path)
+        with self.metrics.sink(progress_sink(progress_callback)), \
+                fitz.open(pdf1_path) as pdf1_document, fitz.open(pdf2_path) as pdf2_document:
+            self.page_pairs, pdf1_fingerprints, pdf2_fingerprints = self.pair_documents(pdf1_document, pdf2_document, mismatch_callback)
+            pdf_hashes = (self.document_hash(pdf1_path), self.document_hash(pdf2_path))
+            total_pages = len(self.page_pairs)
+
+            for position, (i, j) in enumerate(self.page_pairs):
+                with self.metrics.stage('page', page=position + 1):
+                    diff_data = self.page_entry(position, i, j)
+                    page1 = pdf1_document[i] if i is not None else None
+                    page2 = pdf2_document[j] if j is not None else None
+                    for page in (page1, page2):
+                        if page is not None:
+                            self.page_words(page)
+                    if not diff_data['is_extra_page'] and pdf1_fingerprints[i] == pdf2_fingerprints[j]:
+                        self.metrics.count('identical_pages_skipped')
+                        diff_data.update(identical=True, changed_boxes=[], changed_pixels=0,
+                                         vector_changes={'added': [], 'removed': [], 'moved': [], 'changed': []})
+                    else:
+                        with self.metrics.stage('vector_diff'):
+                            diff_data.update(compare_pages_vector(page1, page2, self.threshold, tolerance))
+                        self.metrics.count('objects_changed', sum(len(changes) for changes in diff_data['vector_changes'].values()))
+                    diff_data['has_differences'] = bool(diff_data['changed_boxes'])
+
+                    if output_dir:
+                        side = 0 if page1 is not None else 1
+                        self._save_vector_overlay(diff_data, page1 if page1 is not None else page2, pdf_hashes[side], output_dir)
+                    self.diff_images.append(diff_data)
+                self.metrics.page_done(position + 1, position + 1, total_pages)
+        return self.diff_images
+
+    def _save_vector_overlay(self, diff_data: Dict[str, Any], page: fitz.Page, pdf_hash: Optional[str], output_dir: str) -> None:
+        # The changed object boxes are highlighted on the rendered page, like changed pixels in the raster modes.
+        base = self.render_enhanced(page, pdf_hash)
+        height, width = base.shape[:2]
+        mask = np.zeros((height, width), dtype=np.uint8)
+        boxes = []
+        for box in diff_data['changed_boxes']:
+            # A one-point margin keeps hairlines and other zero-height paths visible.
+            x0, y0 = (max(int((v - 1) * self.render_zoom), 0) for v in box[:2])
+            x1, y1 = min(int((box[2] + 1) * self.render_zoom), width), min(int((box[3] + 1) * self.render_zoom), height)
+            if x0 < x1 and y0 < y1:
+                mask[y0:y1, x0:x1] = 255
+                boxes.append((x0, y0, x1, y1))
+        with self.metrics.stage('colorize'):
+            diff_image = self.kernel.colorize(base, self.color_intensity, boxes, mask=mask)
+        self.save_diff_image(diff_image, os.path.join(output_dir, f"diff_page_{diff_data['page_number']}.png"))
 
     def get_diff_image(self, page_num: int) -> Dict[str, Any]:
         if 0 <= page_num < len(self.diff_images):
-            return self.diff_images[page_num]
+            diff_data = self.diff_images[page_num]
+            if diff_data['image'] is None and page_num < len(self.diff_maps):
+                return dict(diff_data, image=self.render_overlay(page_num))
+            return diff_data
         else:
             return None
 
+    def get_base_image(self, page_num: int) -> Optional[np.ndarray]:
+        # The page the overlay is drawn on: the pdf1 page, or the pdf2 page for inserted pages.
+        if 0 <= page_num < len(self.diff_maps):
+            return cv2.cvtColor(self.page_store.base(self.diff_maps[page_num]), cv2.COLOR_GRAY2RGB)
+        return None
+
+    def render_overlay(self, page_num: int) -> np.ndarray:
+        params = (self.threshold, self.color_intensity)
+        with self._overlay_lock:
+            if self._overlay is None or self._overlay[:2] != (page_num, params):
+                page = self.diff_maps[page_num]
+                base = cv2.cvtColor(self.page_store.base(page), cv2.COLOR_GRAY2RGB)
+                mask = self.page_store.mask(page, params[0])
+                boxes = self.kernel.threshold(mask, 0)['changed_boxes'] if page.diff is not None else []
+                self._overlay = (page_num, params, self.kernel.colorize(base, params[1], boxes, mask=mask, reuse=False))
+            return self._overlay[2]
+
     def save_diff_images(self, output_dir: str) -> None:
         os.makedirs(output_dir, exist_ok=True)
-        for i, diff_data in enumerate(self.diff_images):
+        self.images_dir = output_dir
+        for i in range(len(self.diff_images)):
+            diff_data = self.get_diff_image(i)
+            if diff_data['image'] is None:
+                continue
             output_path = os.path.join(output_dir, f"diff_page_{i+1}.png")
-            diff_image = diff_data['image']
+            self.save_diff_image(diff_data['image'], output_path)
+
+    def save_diff_image(self, diff_image: np.ndarray, output_path: str) -> None:
+        with self.metrics.stage('save_image'):
             diff_image_bgr = cv2.cvtColor(diff_image, cv2.COLOR_RGB2BGR)
             cv2.imwrite(output_path, diff_image_bgr)
 
     def extract_text_and_metadata(self, pdf_path: str) -> Dict[str, Any]:
-        pdf_document = fitz.open(pdf_path)
-        text = ""
-        metadata = pdf_document.metadata
-        for page_num in range(len(pdf_document)):
-            page = pdf_document.load_page(page_num)
-            text += page.get_text()
-        pdf_document.close()
-        return {"text": text, "metadata": metadata}
+        # After a comparison the words are already in the session; only pages never loaded are parsed.
+        content = self.documents.get(document_key(pdf_path))
+        if content is None or content.missing_pages():
+            with fitz.open(pdf_path) as pdf_document:
+                content = self.document_content(pdf_document)
+                for page_index in content.missing_pages():
+                    self.page_words(pdf_document[page_index])
+        return content.info()
 
     def compare_text(self, text1: str, text2: str) -> float:
-        return SequenceMatcher(None, text1, text2).ratio()
+        tokens1 = [hash(token) for token in text1.split()]
+        tokens2 = [hash(token) for token in text2.split()]
+        return similarity(len(match_tokens(tokens1, tokens2)), len(tokens1), len(tokens2))
+
+    def compare_text_pages(self, words1: List[List[tuple]], words2: List[List[tuple]]) -> Dict[str, Any]:
+        return diff_pages(words1, words2)
 
     def compare_metadata(self, metadata1: Dict[str, Any], metadata2: Dict[str, Any]) -> Dict[str, Any]:
         diff = {}
@@ -132,17 +691,50 @@ class PDFComparisonTool:
                 diff[key] = (metadata1.get(key), metadata2.get(key))
         return diff
 
-    def generate_comparison_report(self, pdf1_path: str, pdf2_path: str) -> str:
+    def page_has_differences(self, diff_data: Dict[str, Any]) -> bool:
+        if 'histogram' in diff_data:
+            return bool(diff_data['histogram'][self.threshold + 1:].any())
+        if 'has_differences' in diff_data:
+            return diff_data['has_differences']
+        return np.any(diff_data['image'][:, :, 2] == 255)
+
+    def comparison_summary(self, pdf1_path: str, pdf2_path: str) -> Dict[str, Any]:
         pdf1_info = self.extract_text_and_metadata(pdf1_path)
         pdf2_info = self.extract_text_and_metadata(pdf2_path)
+        keys = (document_key(pdf1_path), document_key(pdf2_path))
+        if self._text_comparison is not None and self._text_comparison[:2] == keys:
+            text_diff = self._text_comparison[2]
+        else:
+            with self.metrics.stage('text_diff'):
+                text_diff = self.compare_text_pages(pdf1_info['words'], pdf2_info['words'])
+            self._text_comparison = (keys[0], keys[1], text_diff)
+        return {
+            'text_diff': text_diff,
+            'text_similarity': text_diff['similarity'],
+            'metadata_diff': self.compare_metadata(pdf1_info['metadata'], pdf2_info['metadata']),
+            'total_pages': len(self.diff_images),
+            'pages_with_differences': [img['page_number'] for img in self.diff_images if self.page_has_differences(img)],
+            'identical_pages': sum(1 for img in self.diff_images if img.get('identical')),
+            'deleted_pages': [img['pdf1_page'] for img in self.diff_images if img.get('status') == 'deleted'],
+            'inserted_pages': [img['pdf2_page'] for img in self.diff_images if img.get('status') == 'inserted'],
+        }
+
+    def generate_comparison_report(self, pdf1_path: str, pdf2_path: str, summary: Optional[Dict[str, Any]] = None) -> str:
+        with self.metrics.stage('report'):
+            if summary is None:
+                summary = self.comparison_summary(pdf1_path, pdf2_path)
+            return self._format_report(summary)
 
-        text_similarity = self.compare_text(pdf1_info['text'], pdf2_info['text'])
-        metadata_diff = self.compare_metadata(pdf1_info['metadata'], pdf2_info['metadata'])
+    def _format_report(self, summary: Dict[str, Any]) -> str:
+        text_diff = summary['text_diff']
+        text_similarity = summary['text_similarity']
+        metadata_diff = summary['metadata_diff']
 
-        total_pages = len(self.diff_images)
-        pages_with_differences = sum(1 for img in self.diff_images if np.any(img['image'][:, :, 2] == 255))
-        
-        report = (
+        total_pages = summary['total_pages']
+        pages_with_differences = len(summary['pages_with_differences'])
+
+        # Parts are collected and joined once; the report can list thousands of text changes.
+        report = [
             f"PDF Comparison Report\n"
             f"{'=' * 30}\n\n"
             f"Resumo:\n"
@@ -150,44 +742,91 @@ class PDFComparisonTool:
             f"- Diferenças em metadados: {len(metadata_diff)} campos\n"
             f"- Total de páginas comparadas: {total_pages}\n"
             f"- Páginas com diferenças detectadas: {pages_with_differences}\n\n"
-        )
+        ]
 
-        report += f"Diferenças nos Metadados:\n"
+        report.append(f"Diferenças nos Metadados:\n")
         if metadata_diff:
             for key, (value1, value2) in metadata_diff.items():
                 value1 = value1 or "Não disponível"
                 value2 = value2 or "Não disponível"
-                report += f"  {key}:\n    PDF1: {value1}\n    PDF2: {value2}\n"
+                report.append(f"  {key}:\n    PDF1: {value1}\n    PDF2: {value2}\n")
         else:
-            report += "  Não foram encontradas diferenças significativas nos metadados.\n"
+            report.append("  Não foram encontradas diferenças significativas nos metadados.\n")
 
-        report += f"\nDiferenças nas Imagens:\n"
-        report += f"  Total de páginas comparadas: {total_pages}\n"
-        report += f"  Páginas com diferenças: {pages_with_differences}\n"
+        report.append(f"\nDiferenças no Texto:\n")
+        if text_diff['spans']:
+            labels = {'insert': 'Inserido', 'delete': 'Removido', 'replace': 'Alterado'}
+            report.append(f"  Trechos alterados: {len(text_diff['spans'])}\n")
+            for span in text_diff['spans'][:self.max_reported_text_changes]:
+                report.append(f"  [{labels[span['type']]}]\n")
+                for side, key in (("PDF1", 'pdf1'), ("PDF2", 'pdf2')):
+                    for location in span[key]:
+                        bbox = ", ".join(f"{v:.0f}" for v in location['bbox'])
+                        report.append(f"    {side} p.{location['page']} ({bbox}): {textwrap.shorten(location['text'], 80)}\n")
+            if len(text_diff['spans']) > self.max_reported_text_changes:
+                report.append(f"  ... e mais {len(text_diff['spans']) - self.max_reported_text_changes} trechos.\n")
+        else:
+            report.append("  Não foram encontradas diferenças no texto.\n")
+
+        report.append(f"\nDiferenças nas Imagens:\n")
+        report.append(f"  Total de páginas comparadas: {total_pages}\n")
+        report.append(f"  Páginas com diferenças: {pages_with_differences}\n")
+        if summary['identical_pages']:
+            report.append(f"  Páginas com conteúdo idêntico (comparação de pixels ignorada): {summary['identical_pages']}\n")
+        if summary['deleted_pages']:
+            report.append(f"  Páginas do PDF1 ausentes no PDF2: {', '.join(map(str, summary['deleted_pages']))}\n")
+        if summary['inserted_pages']:
+            report.append(f"  Páginas inseridas no PDF2: {', '.join(map(str, summary['inserted_pages']))}\n")
         if pages_with_differences > 0:
-            paginas_com_diferencas = [i+1 for i, img in enumerate(self.diff_images) if np.any(img['image'][:, :, 2] == 255)]
-            report += f"  Páginas afetadas: {', '.join(map(str, paginas_com_diferencas))}\n"
-            report += f"  Imagens de diferenças salvas em: /caminho/para/imagens\n"
+            report.append(f"  Páginas afetadas: {', '.join(map(str, summary['pages_with_differences']))}\n")
+            if self.images_dir:
+                report.append(f"  Imagens de diferenças salvas em: {self.images_dir}\n")
         else:
-            report += "  Não foram encontradas diferenças visuais entre as páginas.\n"
+            report.append("  Não foram encontradas diferenças visuais entre as páginas.\n")
+
+        vector_pages = [img for img in self.diff_images if img.get('vector_changes')]
+        if vector_pages:
+            report.append(self._format_vector_changes(vector_pages))
 
-        interpretacao = (
+        report.append(
             f"\nInterpretação dos Resultados:\n"
             f"A similaridade do texto entre os PDFs é {text_similarity:.2%}, o que sugere que os documentos são "
             f"{'muito semelhantes' if text_similarity > 0.80 else 'bastante diferentes'}.\n"
         )
         if metadata_diff:
-            interpretacao += (
+            report.append(
                 "Diferenças significativas nos metadados foram detectadas. Isso pode indicar que os arquivos foram "
                 "gerados por ferramentas ou processos diferentes, ou que eles foram alterados em momentos distintos.\n"
             )
         if pages_with_differences > 0:
-            interpretacao += (
+            report.append(
                 f"As diferenças visuais encontradas em {pages_with_differences} página(s) indicam alterações no layout ou "
                 "nos elementos gráficos, o que pode impactar a apresentação visual dos documentos.\n"
             )
         else:
-            interpretacao += "Não foram encontradas diferenças visuais, sugerindo que os documentos são visualmente idênticos.\n"
+            report.append("Não foram encontradas diferenças visuais, sugerindo que os documentos são visualmente idênticos.\n")
+
+        return "".join(report)
 
-        report += interpretacao
-        return report
\ No newline at end of file
+    def _format_vector_changes(self, vector_pages: List[Dict[str, Any]]) -> str:
+        labels = {'added': 'Adicionado', 'removed': 'Removido', 'moved': 'Movido', 'changed': 'Imagem alterada'}
+        kinds = {'text': 'texto', 'drawing': 'desenho', 'image': 'imagem'}
+        report = [f"\nDiferenças nos Objetos:\n"]
+        reported = 0
+        for diff_data in vector_pages:
+            changes = diff_data['vector_changes']
+            if not any(changes.values()):
+                continue
+            counts = ", ".join(f"{labels[kind].lower()}: {len(changes[kind])}" for kind in labels if changes[kind])
+            report.append(f"  Página {diff_data['page_number']}: {counts}\n")
+            for kind in labels:
+                for change in changes[kind]:
+                    if reported < self.max_reported_text_changes:
+                        bbox = ", ".join(f"{v:.0f}" for v in change['bbox'])
+                        report.append(f"    [{labels[kind]}] {kinds[change['kind']]} ({bbox}): {textwrap.shorten(change['label'], 60)}\n")
+                    reported += 1
+        if reported > self.max_reported_text_changes:
+            report.append(f"  ... e mais {reported - self.max_reported_text_changes} objetos.\n")
+        elif not reported:
+            report.append("  Não foram encontradas diferenças nos objetos das páginas.\n")
+        return "".join(report)
@@ -0,0 +1,481 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+
+from .cli import page_summary
+from .metrics import Metrics
+from .parallel import compare_page_range, default_worker_count, split_page_ranges
+
+DEFAULT_PORT = 8765
+# Pages per task sent to the pool; smaller chunks stream and cancel sooner.
+DEFAULT_CHUNK_SIZE = 4
+# Finished jobs kept for status queries before the oldest are forgotten.
+MAX_FINISHED_JOBS = 1000
+MAX_REQUEST_BODY = 1024 ** 2
+
+JOB_OPTIONS = ('threshold', 'color_intensity', 'page_alignment', 'render_zoom')
+# Highest render zoom a job may ask for (576 dpi); an A4 page is then about 4800x6700 pixels.
+MAX_RENDER_ZOOM = 8.0
+
+
+def _number(name: str, value: Any, low: float, high: float, integer: bool = False):
+    # Booleans are ints in Python but never a meaningful threshold or zoom.
+    # JSON accepts 1e400 and Infinity; int() of them would raise OverflowError.
+    if (isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value)
+            or (integer and value != int(value))):
+        raise ValueError(f"{name} deve ser um número{' inteiro' if integer else ''}")
+    if not low <= value <= high:
+        raise ValueError(f"{name} deve estar entre {low:g} e {high:g}")
+    return int(value) if integer else float(value)
+
+
+def validate_job_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check the option overrides of a job before it is queued, so a bad value is reported
+    to the caller instead of failing inside a worker. Raises ValueError.
+    """
+    unknown = set(options) - set(JOB_OPTIONS)
+    if unknown:
+        raise ValueError(f"Opções desconhecidas: {', '.join(sorted(unknown))}")
+    validated = {}
+    if 'threshold' in options:
+        validated['threshold'] = _number('threshold', options['threshold'], 0, 255, integer=True)
+    if 'color_intensity' in options:
+        validated['color_intensity'] = _number('color_intensity', options['color_intensity'], 0, 1)
+    if 'render_zoom' in options:
+        validated['render_zoom'] = _number('render_zoom', options['render_zoom'], 0, MAX_RENDER_ZOOM)
+        if validated['render_zoom'] == 0:
+            raise ValueError("render_zoom deve ser maior que zero")
+    if 'page_alignment' in options:
+        if not isinstance(options['page_alignment'], bool):
+            raise ValueError("page_alignment deve ser true ou false")
+        validated['page_alignment'] = options['page_alignment']
+    return validated
+
+
+def prepare_job(pdf1_path: str, pdf2_path: str, tool_options: Dict[str, Any]):
+    # Runs inside a worker process: fingerprinting and page alignment read both documents.
+    # The render cache keys and page fingerprints computed here are shared by every chunk.
+    from .pdf_tool import PDFComparisonTool
+
+    tool = PDFComparisonTool.from_worker_options(tool_options)
+    pairs, pdf1_fingerprints, pdf2_fingerprints = tool.prepare_page_pairs(pdf1_path, pdf2_path)
+    return pairs, tool.document_hashes(pdf1_path, pdf2_path), (pdf1_fingerprints, pdf2_fingerprints)
+
+
+def summarize_job(pdf1_path: str, pdf2_path: str, pages: List[Dict[str, Any]], words: Tuple[Dict[int, list], Dict[int, list]],
+                  tool_options: Dict[str, Any], output_dir: Optional[str]) -> Tuple[Dict[str, Any], str]:
+    # Runs inside a worker process: the text diff of long documents would stall the event loop.
+    import fitz
+    from .pdf_tool import PDFComparisonTool
+
+    tool = PDFComparisonTool.from_worker_options(tool_options)
+    tool.start_session(pdf1_path, pdf2_path)
+    with fitz.open(pdf1_path) as pdf1_document, fitz.open(pdf2_path) as pdf2_document:
+        tool.document_content(pdf1_document).add_words(words[0])
+        tool.document_content(pdf2_document).add_words(words[1])
+    tool.diff_images = pages
+    tool.images_dir = output_dir
+    summary = tool.comparison_summary(pdf1_path, pdf2_path)
+    return summary, tool.generate_comparison_report(pdf1_path, pdf2_path, summary)
+
+
+class ComparisonJob:
+    """
+    One submitted comparison. Page results are appended as the worker chunks finish;
+    stream() yields them to any number of readers, including ones that start late.
+    """
+
+    def __init__(self, job_id: str, pdf1_path: str, pdf2_path: str, priority: int, tool_options: Dict[str, Any],
+                 output_dir: Optional[str] = None):
+        self.id = job_id
+        self.pdf1 = pdf1_path
+        self.pdf2 = pdf2_path
+        self.priority = priority
+        self.tool_options = tool_options
+        self.output_dir = output_dir
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.total_pages: Optional[int] = None
+        self.pages: List[Dict[str, Any]] = []
+        self.summary: Optional[Dict[str, Any]] = None
+        self.report: Optional[str] = None
+        self.metrics = Metrics()
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def add_pages(self, pages: List[Dict[str, Any]]) -> None:
+        self.pages.extend(pages)
+        self._notify()
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished = time.time()
+        self._notify()
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        # Pages come in chunk completion order; each carries its page_number.
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.pages):
+                yield self.pages[sent]
+                sent += 1
+            if self.done:
+                return
+            await changed.wait()
+
+    async def wait(self) -> 'ComparisonJob':
+        async for _ in self.stream():
+            pass
+        return self
+
+    def info(self, with_summary: bool = True) -> Dict[str, Any]:
+        info = {
+            'id': self.id,
+            'pdf1': self.pdf1,
+            'pdf2': self.pdf2,
+            'priority': self.priority,
+            'status': self.status,
+            'error': self.error,
+            'total_pages': self.total_pages,
+            'pages_done': len(self.pages),
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+        if with_summary:
+            info['summary'] = self.summary
+            info['metrics'] = self.metrics.summary() if self.done else None
+        return info
+
+
+class ComparisonService:
+    """
+    Asynchronous front to the comparison engine for long-lived processes.
+
+    Jobs wait in a priority queue (higher priority first, then submission order) and at
+    most max_jobs run at a time. A running job splits its page pairs into chunks that
+    are compared on a shared process pool of `workers` processes, with at most `workers`
+    chunks of the same job in flight, so page results stream back while later pages are
+    still being rendered. Each job builds its own PDFComparisonTool in the workers, so
+    jobs share no comparison state. Cancelling a job drops its queued chunks at once; a
+    chunk already running in a worker finishes, but its result is discarded.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_jobs: Optional[int] = None, cache_dir: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_finished_jobs: int = MAX_FINISHED_JOBS):
+        from .pdf_tool import PDFComparisonTool
+
+        self.workers = workers or default_worker_count()
+        self.max_jobs = max_jobs or self.workers
+        self.chunk_size = chunk_size
+        self.max_finished_jobs = max_finished_jobs
+        # Defaults for the job options; the render cache is shared by every job.
+        self.default_options = PDFComparisonTool(cache_dir=cache_dir).worker_options()
+        self.jobs: Dict[str, ComparisonJob] = {}
+        self._finished = deque()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._sequence = itertools.count(1)
+
+    async def start(self) -> None:
+        self._queue = asyncio.PriorityQueue()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.max_jobs)]
+
+    async def close(self) -> None:
+        running = [job.task for job in self.jobs.values() if job.task is not None]
+        for job in list(self.jobs.values()):
+            self.cancel(job.id)
+        await asyncio.gather(*running, return_exceptions=True)
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def __aenter__(self) -> 'ComparisonService':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def submit(self, pdf1_path: str, pdf2_path: str, priority: int = 0, output_dir: Optional[str] = None,
+               **options: Any) -> ComparisonJob:
+        """
+        Queue a comparison. options may override threshold, color_intensity,
+        page_alignment and render_zoom. Raises ValueError for unknown or out-of-range
+        options and for files that do not exist.
+        """
+        if self._queue is None:
+            raise RuntimeError("O serviço de comparação não foi iniciado")
+        options = validate_job_options(options)
+        priority = _number('priority', priority, -1e9, 1e9, integer=True)
+        for path in (pdf1_path, pdf2_path):
+            if not os.path.isfile(path):
+                raise ValueError(f"Arquivo não encontrado: {path}")
+        sequence = next(self._sequence)
+        job = ComparisonJob(f"job-{sequence}", pdf1_path, pdf2_path, priority, dict(self.default_options, **options), output_dir)
+        self.jobs[job.id] = job
+        self._queue.put_nowait((-priority, sequence, job))
+        return job
+
+    def job(self, job_id: str) -> Optional[ComparisonJob]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            # Still queued: the dispatcher skips it when it comes up.
+            job.finish('cancelled')
+            self._forget_later(job)
+        return True
+
+    async def results(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        job = self.jobs[job_id]
+        async for page in job.stream():
+            yield page
+
+    async def _dispatch(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            if job.done:
+                continue
+            # The job runs in its own task so cancelling it leaves the dispatcher running.
+            job.task = asyncio.create_task(self._run(job))
+            try:
+                await asyncio.wait([job.task])
+            finally:
+                job.task = None
+                self._forget_later(job)
+
+    async def _run(self, job: ComparisonJob) -> None:
+        loop = asyncio.get_running_loop()
+        job.status = 'running'
+        job.started = time.time()
+        pending = set()
+        try:
+            pairs, pdf_hashes, fingerprints = await loop.run_in_executor(self._executor, prepare_job, job.pdf1, job.pdf2, job.tool_options)
+            job.total_pages = len(pairs)
+            if job.output_dir:
+                os.makedirs(job.output_dir, exist_ok=True)
+            page_ranges = deque(split_page_ranges(len(pairs), self.workers, self.chunk_size))
+            words = ({}, {})
+            while page_ranges or pending:
+                while page_ranges and len(pending) < self.workers:
+                    pages = page_ranges.popleft()
+                    pending.add(loop.run_in_executor(
+                        self._executor, compare_page_range, job.pdf1, job.pdf2, pairs[pages.start:pages.stop],
+                        pages.start, job.tool_options, job.output_dir, False, pdf_hashes, fingerprints))
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Reading every exception marks them all retrieved, not only the one raised.
+                errors = [future.exception() for future in done if future.exception() is not None]
+                if errors:
+                    raise errors[0]
+                for future in done:
+                    chunk, worker_metrics, worker_words = future.result()
+                    words[0].update(worker_words[0])
+                    words[1].update(worker_words[1])
+                    job.metrics.merge(worker_metrics)
+                    chunk.sort(key=lambda diff_data: diff_data['page_number'])
+                    job.add_pages([page_summary(diff_data, diff_data['has_differences']) for diff_data in chunk])
+
+            pages = sorted(job.pages, key=lambda page: page['page_number'])
+            job.summary, job.report = await loop.run_in_executor(
+                self._executor, summarize_job, job.pdf1, job.pdf2, pages, words, job.tool_options, job.output_dir)
+            job.finish('done')
+            logging.info(f"{job.id}: concluído ({job.total_pages} páginas)")
+        except asyncio.CancelledError:
+            job.finish('cancelled')
+            logging.info(f"{job.id}: cancelado")
+            raise
+        except Exception as e:
+            logging.error(f"{job.id}: falhou: {str(e)}", exc_info=True)
+            job.finish('failed', str(e))
+        finally:
+            # Chunks not started yet give their pool slots back to other jobs; chunks
+            # already running cannot be stopped, their results are dropped.
+            for future in pending:
+                future.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _forget_later(self, job: ComparisonJob) -> None:
+        if job.id in self._finished:
+            return
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_finished_jobs:
+            self.jobs.pop(self._finished.popleft(), None)
+
+
+class HTTPFrontend:
+    """
+    Minimal local HTTP/1.1 interface to a ComparisonService, one request per connection:
+
+    POST   /jobs             JSON {pdf1, pdf2, priority?, output_dir?, threshold?, ...}
+    GET    /jobs             status of every known job
+    GET    /jobs/ID          status, summary and metrics of a job
+    GET    /jobs/ID/pages    page results as JSON Lines, streamed until the job ends
+    GET    /jobs/ID/report   the text report of a finished job
+    DELETE /jobs/ID          cancel the job
+    """
+
+    def __init__(self, service: ComparisonService, host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+        self.service = service
+        self.host = host
+        self.port = port
+
+    async def start(self) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, self.host, self.port)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, body = await self._read_request(reader)
+            await self._route(method, path, body, writer)
+        except ValueError as e:
+            await self._respond(writer, 400, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logging.error(f"Erro ao atender requisição: {str(e)}", exc_info=True)
+            await self._respond(writer, 500, {'error': str(e)})
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise ValueError("Requisição inválida")
+        method, path, _ = request_line
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0))
+        if length > MAX_REQUEST_BODY:
+            raise ValueError("Corpo da requisição muito grande")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), path.split('?', 1)[0].rstrip('/'), body
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        parts = path.strip('/').split('/')
+        if parts[0] != 'jobs' or len(parts) > 3:
+            return await self._respond(writer, 404, {'error': "Recurso não encontrado"})
+        if len(parts) == 1:
+            if method == 'POST':
+                return await self._respond(writer, 202, self._submit(body).info(with_summary=False))
+            if method == 'GET':
+                return await self._respond(writer, 200, [job.info(with_summary=False) for job in self.service.jobs.values()])
+            return await self._respond(writer, 405, {'error': "Método não permitido"})
+
+        job = self.service.job(parts[1])
+        if job is None:
+            return await self._respond(writer, 404, {'error': f"Comparação desconhecida: {parts[1]}"})
+        resource = parts[2] if len(parts) == 3 else None
+        if method == 'DELETE' and resource is None:
+            self.service.cancel(job.id)
+            return await self._respond(writer, 200, job.info(with_summary=False))
+        if method != 'GET':
+            return await self._respond(writer, 405, {'error': "Método não permitido"})
+        if resource is None:
+            return await self._respond(writer, 200, job.info())
+        if resource == 'pages':
+            return await self._stream_pages(job, writer)
+        if resource == 'report':
+            if job.report is None:
+                return await self._respond(writer, 409, {'error': "O relatório ainda não está disponível", 'status': job.status})
+            return await self._respond(writer, 200, job.report, content_type='text/plain; charset=utf-8')
+        return await self._respond(writer, 404, {'error': "Recurso não encontrado"})
+
+    def _submit(self, body: bytes) -> ComparisonJob:
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            raise ValueError("JSON inválido")
+        if not isinstance(request, dict) or 'pdf1' not in request or 'pdf2' not in request:
+            raise ValueError("Informe pdf1 e pdf2")
+        options = {key: value for key, value in request.items() if key not in ('pdf1', 'pdf2', 'priority', 'output_dir')}
+        if not all(isinstance(request.get(key), str) for key in ('pdf1', 'pdf2')) or \
+                not isinstance(request.get('output_dir') or '', str):
+            raise ValueError("pdf1, pdf2 e output_dir devem ser caminhos")
+        return self.service.submit(request['pdf1'], request['pdf2'], request.get('priority', 0),
+                                   request.get('output_dir'), **options)
+
+    async def _stream_pages(self, job: ComparisonJob, writer: asyncio.StreamWriter) -> None:
+        # The body ends when the connection closes, so no length or chunking is needed.
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        async for page in job.stream():
+            writer.write(json.dumps(page, ensure_ascii=False).encode('utf-8') + b"\n")
+            await writer.drain()
+        writer.write(json.dumps({'status': job.status, 'error': job.error}).encode('utf-8') + b"\n")
+        await writer.drain()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Any,
+                       content_type: str = 'application/json; charset=utf-8') -> None:
+        reasons = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                   409: 'Conflict', 500: 'Internal Server Error'}
+        body = payload.encode('utf-8') if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+
+
+async def serve(host: str, port: int, workers: Optional[int], max_jobs: Optional[int], cache_dir: Optional[str]) -> None:
+    async with ComparisonService(workers, max_jobs, cache_dir) as service:
+        server = await HTTPFrontend(service, host, port).start()
+        logging.info(f"Serviço de comparação em http://{host}:{port}/jobs ({service.workers} processos, {service.max_jobs} comparações simultâneas)")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="pdfcomparator-server", description="Serviço HTTP local de comparação de PDFs.")
+    parser.add_argument("--host", default='127.0.0.1', help="Endereço de escuta")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Porta de escuta")
+    parser.add_argument("-w", "--workers", type=int, help="Processos de comparação compartilhados pelas comparações")
+    parser.add_argument("-j", "--jobs", type=int, help="Comparações executadas ao mesmo tempo")
+    parser.add_argument("-c", "--cache", help="Diretório do cache de páginas renderizadas")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.jobs, args.cache))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
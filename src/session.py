@@ -0,0 +1,100 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from .alignment import PagePair
+
+# Bumped whenever page fingerprints change meaning, so stale records are ignored.
+SESSION_FORMAT = 2
+
+
+def pack_mask(mask: np.ndarray) -> Dict[str, Any]:
+    # Bit-packed and deflated: a change mask of a text edit takes a few hundred bytes.
+    packed = np.packbits(mask > 0)
+    return {'shape': list(mask.shape), 'bits': base64.b64encode(zlib.compress(packed.tobytes())).decode('ascii')}
+
+
+def unpack_mask(data: Dict[str, Any]) -> np.ndarray:
+    height, width = data['shape']
+    packed = np.frombuffer(zlib.decompress(base64.b64decode(data['bits'])), dtype=np.uint8)
+    return np.unpackbits(packed, count=height * width).reshape(height, width) * np.uint8(255)
+
+
+class ComparisonStore:
+    """
+    Persistent, content-addressed results of earlier comparisons.
+
+    documents/  one record per PDF file (by SHA-256 of its bytes): page fingerprints and metadata
+    pages/      the words of each distinct page, by page fingerprint
+    pairs/      the diff statistics and change mask of a page pair, by the two page
+                fingerprints and the settings that affect the raster diff
+    alignments/ the page pairing of two documents
+
+    Nothing is tied to a particular comparison, so comparing revision N+2 with N
+    reuses every page pair already diffed while comparing N, N+1 and N+2, and pages
+    whose fingerprints did not change are never rendered or parsed again.
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        for kind in ('documents', 'pages', 'pairs', 'alignments'):
+            os.makedirs(os.path.join(store_dir, kind), exist_ok=True)
+
+    def _path(self, kind: str, key: str) -> str:
+        if kind in ('pages', 'pairs'):
+            return os.path.join(self.store_dir, kind, key[:2], f"{key}.json")
+        return os.path.join(self.store_dir, kind, f"{key}.json")
+
+    def _read(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(kind, key), encoding='utf-8') as record_file:
+                record = json.load(record_file)
+        except (OSError, ValueError):
+            return None
+        return record if record.get('format') == SESSION_FORMAT else None
+
+    def _write(self, kind: str, key: str, record: Dict[str, Any]) -> None:
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            json.dump(dict(record, format=SESSION_FORMAT), tmp_file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def document(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        return self._read('documents', file_hash)
+
+    def put_document(self, file_hash: str, fingerprints: List[str], metadata: Dict[str, Any]) -> None:
+        self._write('documents', file_hash, {'fingerprints': fingerprints, 'metadata': metadata})
+
+    def page_words(self, fingerprint: str) -> Optional[List[tuple]]:
+        record = self._read('pages', fingerprint)
+        return [tuple(word) for word in record['words']] if record else None
+
+    def put_page_words(self, fingerprint: str, words: List[tuple]) -> None:
+        self._write('pages', fingerprint, {'words': [list(word) for word in words]})
+
+    def alignment(self, file_hash1: str, file_hash2: str, page_alignment: bool) -> Optional[List[PagePair]]:
+        record = self._read('alignments', f"{file_hash1}_{file_hash2}_{int(page_alignment)}")
+        return [tuple(pair) for pair in record['pairs']] if record else None
+
+    def put_alignment(self, file_hash1: str, file_hash2: str, page_alignment: bool, pairs: List[PagePair]) -> None:
+        self._write('alignments', f"{file_hash1}_{file_hash2}_{int(page_alignment)}", {'pairs': [list(pair) for pair in pairs]})
+
+    @staticmethod
+    def pair_key(fingerprint1: Optional[str], fingerprint2: Optional[str], threshold: int, render_zoom: float) -> str:
+        # A missing page is compared against a blank one, so it gets its own key component.
+        raw = f"{fingerprint1 or '-'}:{fingerprint2 or '-'}:{threshold}:{render_zoom:g}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def pair(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._read('pairs', key)
+
+    def put_pair(self, key: str, stats: Dict[str, Any], mask: Optional[Dict[str, Any]]) -> None:
+        self._write('pairs', key, dict(stats, mask=mask))
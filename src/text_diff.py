@@ -0,0 +1,206 @@
+from bisect import bisect_left
+from typing import List, Dict, Any, Tuple, Optional, Sequence
+
+# Upper bound on the edit distance explored by the Myers fallback inside a single gap
+# between anchors. Gaps needing more edits are reported as a replacement.
+MAX_MYERS_EDITS = 1000
+
+Word = Tuple[float, float, float, float, str]
+
+
+def tokenize_pages(pages: Sequence[Sequence[Word]]) -> Tuple[List[int], List[Tuple[int, Word]]]:
+    """
+    Flatten per-page word lists (as returned by page.get_text("words")) into hashed
+    tokens plus their (page index, word) locations.
+    """
+    hashes = []
+    locations = []
+    for page_index, words in enumerate(pages):
+        for word in words:
+            hashes.append(hash(word[4]))
+            locations.append((page_index, word))
+    return hashes, locations
+
+
+def _unique_common(a: Sequence[int], a_lo: int, a_hi: int, b: Sequence[int], b_lo: int, b_hi: int) -> List[Tuple[int, int]]:
+    counts: Dict[int, List[int]] = {}
+    for i in range(a_lo, a_hi):
+        entry = counts.setdefault(a[i], [0, i, 0, -1])
+        entry[0] += 1
+    for j in range(b_lo, b_hi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[2] += 1
+            entry[3] = j
+    return sorted((entry[1], entry[3]) for entry in counts.values() if entry[0] == 1 and entry[2] == 1)
+
+
+def _longest_increasing(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    # Patience sorting over the b positions of anchors already ordered by a position.
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous: List[int] = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pos] = j
+            tail_index[pos] = index
+        previous[index] = tail_index[pos - 1] if pos > 0 else -1
+    result = []
+    index = tail_index[-1] if tail_index else -1
+    while index != -1:
+        result.append(pairs[index])
+        index = previous[index]
+    result.reverse()
+    return result
+
+
+def _myers(a: Sequence[int], a_lo: int, a_hi: int, b: Sequence[int], b_lo: int, b_hi: int, max_edits: int) -> Optional[List[Tuple[int, int]]]:
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    v = {1: 0}
+    trace = []
+    for d in range(min(n + m, max_edits) + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, n, m, a_lo, b_lo)
+    return None
+
+
+def _myers_backtrack(trace: List[Dict[int, int]], x: int, y: int, a_lo: int, b_lo: int) -> List[Tuple[int, int]]:
+    matches = []
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v.get(k - 1, -1) < v.get(k + 1, -1)):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v.get(prev_k, 0)
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((a_lo + x, b_lo + y))
+        if d > 0:
+            x, y = prev_x, prev_y
+    matches.reverse()
+    return matches
+
+
+def match_tokens(a: Sequence[int], b: Sequence[int], max_edits: int = MAX_MYERS_EDITS) -> List[Tuple[int, int]]:
+    """
+    Return the matched (i, j) token pairs, in increasing order, of a patience diff of a
+    and b. Tokens unique to both sides anchor the alignment; the gaps between anchors
+    are refined recursively and finally with a bounded Myers O(ND) diff, which keeps
+    the whole diff close to linear on long documents.
+    """
+    matches: List[Tuple[int, int]] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            matches.append((a_lo, b_lo))
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            matches.append((a_hi, b_hi))
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+
+        anchors = _longest_increasing(_unique_common(a, a_lo, a_hi, b, b_lo, b_hi))
+        if anchors:
+            bounds = [(a_lo - 1, b_lo - 1)] + anchors + [(a_hi, b_hi)]
+            for (i1, j1), (i2, j2) in zip(bounds, bounds[1:]):
+                if (i2, j2) != (a_hi, b_hi):
+                    matches.append((i2, j2))
+                if i1 + 1 < i2 and j1 + 1 < j2:
+                    stack.append((i1 + 1, i2, j1 + 1, j2))
+        else:
+            matches.extend(_myers(a, a_lo, a_hi, b, b_lo, b_hi, max_edits) or [])
+    matches.sort()
+    return matches
+
+
+def opcodes(matches: List[Tuple[int, int]], len_a: int, len_b: int) -> List[Tuple[str, int, int, int, int]]:
+    # Same shape as difflib.SequenceMatcher.get_opcodes().
+    codes = []
+    i = j = 0
+    for mi, mj in matches + [(len_a, len_b)]:
+        if i < mi and j < mj:
+            codes.append(('replace', i, mi, j, mj))
+        elif i < mi:
+            codes.append(('delete', i, mi, j, j))
+        elif j < mj:
+            codes.append(('insert', i, i, j, mj))
+        if mi < len_a and mj < len_b:
+            if codes and codes[-1][0] == 'equal' and codes[-1][2] == mi:
+                codes[-1] = ('equal', codes[-1][1], mi + 1, codes[-1][3], mj + 1)
+            else:
+                codes.append(('equal', mi, mi + 1, mj, mj + 1))
+        i, j = mi + 1, mj + 1
+    return codes
+
+
+def similarity(matched: int, len_a: int, len_b: int) -> float:
+    return 2.0 * matched / (len_a + len_b) if len_a + len_b else 1.0
+
+
+def _span_locations(locations: List[Tuple[int, Word]], lo: int, hi: int) -> List[Dict[str, Any]]:
+    # One entry per page touched by the span, with the union of the word boxes.
+    by_page: Dict[int, Dict[str, Any]] = {}
+    for page_index, (x0, y0, x1, y1, text) in ((p, w[:5]) for p, w in locations[lo:hi]):
+        entry = by_page.get(page_index)
+        if entry is None:
+            by_page[page_index] = {'page': page_index + 1, 'bbox': [x0, y0, x1, y1], 'words': [text]}
+        else:
+            bbox = entry['bbox']
+            bbox[0], bbox[1] = min(bbox[0], x0), min(bbox[1], y0)
+            bbox[2], bbox[3] = max(bbox[2], x1), max(bbox[3], y1)
+            entry['words'].append(text)
+    return [
+        {'page': entry['page'], 'bbox': tuple(entry['bbox']), 'text': ' '.join(entry['words'])}
+        for entry in by_page.values()
+    ]
+
+
+def diff_pages(pages1: Sequence[Sequence[Word]], pages2: Sequence[Sequence[Word]]) -> Dict[str, Any]:
+    """
+    Word-level diff of two documents given as per-page word lists. Returns the
+    similarity score (same definition as SequenceMatcher.ratio, over words) and the
+    inserted, deleted and replaced spans with their page numbers and bounding boxes.
+    """
+    hashes1, locations1 = tokenize_pages(pages1)
+    hashes2, locations2 = tokenize_pages(pages2)
+    matches = match_tokens(hashes1, hashes2)
+
+    spans = []
+    for tag, i1, i2, j1, j2 in opcodes(matches, len(hashes1), len(hashes2)):
+        if tag == 'equal':
+            continue
+        spans.append({
+            'type': tag,
+            'pdf1': _span_locations(locations1, i1, i2),
+            'pdf2': _span_locations(locations2, j1, j2),
+        })
+    return {
+        'similarity': similarity(len(matches), len(hashes1), len(hashes2)),
+        'spans': spans,
+        'words1': len(hashes1),
+        'words2': len(hashes2),
+    }
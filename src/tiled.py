@@ -0,0 +1,107 @@
+import cv2
+import fitz
+import numpy as np
+from typing import List, Dict, Any, Tuple
+
+FINE_ZOOM = 300 / 72
+
+
+def render_gray(page: fitz.Page, zoom: float, size: Tuple[int, int]) -> np.ndarray:
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY)
+    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+    # Pages of different sizes are padded with white up to the common canvas.
+    canvas = np.full(size, 255, dtype=np.uint8)
+    canvas[:gray.shape[0], :gray.shape[1]] = gray[:size[0], :size[1]]
+    return canvas
+
+
+def render_clip(page: fitz.Page, clip: fitz.Rect, zoom: float) -> np.ndarray:
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width * 3].reshape(pix.height, pix.width, 3).copy()
+
+
+def changed_tile_regions(diff: np.ndarray, threshold: int, tile_size: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Return (x0, y0, x1, y1) pixel boxes of groups of adjacent tiles containing at least
+    one pixel whose difference exceeds the threshold.
+    """
+    height, width = diff.shape
+    rows = -(-height // tile_size)
+    cols = -(-width // tile_size)
+    padded = np.zeros((rows * tile_size, cols * tile_size), dtype=np.uint8)
+    padded[:height, :width] = diff
+    tiles = padded.reshape(rows, tile_size, cols, tile_size).max(axis=(1, 3)) > threshold
+    if not tiles.any():
+        return []
+    # Growing by one tile merges neighbouring changes and leaves a margin around each region.
+    grown = cv2.dilate(tiles.astype(np.uint8), np.ones((3, 3), np.uint8))
+    count, _, stats, _ = cv2.connectedComponentsWithStats(grown, connectivity=8)
+    regions = []
+    for x, y, w, h, _ in stats[1:count]:
+        regions.append((x * tile_size, y * tile_size, min((x + w) * tile_size, width), min((y + h) * tile_size, height)))
+    return regions
+
+
+def compare_pages_tiled(page1: fitz.Page, page2: fitz.Page, threshold: int, color_intensity: float,
+                        coarse_zoom: float = 0.5, fine_zoom: float = FINE_ZOOM, tile_size: int = 16,
+                        coarse_threshold: int = None) -> Dict[str, Any]:
+    """
+    Coarse-to-fine page comparison. Both pages are rendered in grayscale at coarse_zoom
+    and split into tiles; only regions made of tiles that differ are re-rendered at
+    fine_zoom through a clip rectangle and diffed at full resolution. CLAHE enhancement
+    is not applied, as it depends on the whole page.
+
+    Returns the changed bounding boxes in PDF points and, for each, the high-resolution
+    patches of both pages, the change mask and the coloured overlay.
+    """
+    if coarse_threshold is None:
+        # Downsampling averages thin strokes away, so the coarse pass is more sensitive;
+        # false positives are discarded by the fine pass.
+        coarse_threshold = threshold // 2
+    canvas = page1.rect | page2.rect
+    size = (int(np.ceil(canvas.height * coarse_zoom)), int(np.ceil(canvas.width * coarse_zoom)))
+    diff = cv2.absdiff(render_gray(page1, coarse_zoom, size), render_gray(page2, coarse_zoom, size))
+
+    boxes = []
+    patches = []
+    alpha = 1 - color_intensity
+    for x0, y0, x1, y1 in changed_tile_regions(diff, coarse_threshold, tile_size):
+        clip = fitz.Rect(x0 / coarse_zoom, y0 / coarse_zoom, x1 / coarse_zoom, y1 / coarse_zoom)
+        patch1 = render_clip(page1, clip, fine_zoom)
+        patch2 = render_clip(page2, clip, fine_zoom)
+        height = max(patch1.shape[0], patch2.shape[0])
+        width = max(patch1.shape[1], patch2.shape[1])
+        patch1 = _pad(patch1, height, width)
+        patch2 = _pad(patch2, height, width)
+
+        fine_diff = cv2.absdiff(cv2.cvtColor(patch1, cv2.COLOR_RGB2GRAY), cv2.cvtColor(patch2, cv2.COLOR_RGB2GRAY))
+        _, mask = cv2.threshold(fine_diff, threshold, 255, cv2.THRESH_BINARY)
+        points = cv2.findNonZero(mask)
+        if points is None:
+            continue
+        bx, by, bw, bh = cv2.boundingRect(points)
+        bbox = (clip.x0 + bx / fine_zoom, clip.y0 + by / fine_zoom,
+                clip.x0 + (bx + bw) / fine_zoom, clip.y0 + (by + bh) / fine_zoom)
+
+        overlay = np.zeros_like(patch1)
+        overlay[mask == 0] = [0, 255, 0]
+        overlay[mask != 0] = [0, 0, 255]
+        boxes.append(bbox)
+        patches.append({
+            'bbox': bbox,
+            'clip': tuple(clip),
+            'pdf1': patch1,
+            'pdf2': patch2,
+            'mask': mask,
+            'image': cv2.addWeighted(patch1, alpha, overlay, 1 - alpha, 0),
+            'changed_pixels': int(cv2.countNonZero(mask)),
+        })
+    return {'changed_boxes': boxes, 'patches': patches}
+
+
+def _pad(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    if image.shape[:2] == (height, width):
+        return image
+    padded = np.full((height, width, 3), 255, dtype=np.uint8)
+    padded[:image.shape[0], :image.shape[1]] = image
+    return padded
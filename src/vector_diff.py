@@ -0,0 +1,248 @@
+import cv2
+import fitz
+import math
+from collections import defaultdict
+from typing import List, Dict, Any, NamedTuple, Optional, Set, Tuple
+
+from .tiled import render_clip, _pad, FINE_ZOOM
+
+# Objects whose corners moved by less than this many points are considered in place.
+VECTOR_TOLERANCE = 0.5
+# Side of the cells of the spatial index, in points.
+GRID_CELL = 36.0
+
+PATH_LABELS = {'s': 'contorno', 'f': 'preenchimento', 'fs': 'preenchimento e contorno', 'clip': 'recorte'}
+
+TEXT_FLAGS = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+BBox = Tuple[float, float, float, float]
+
+
+class PageObject(NamedTuple):
+    kind: str
+    bbox: BBox
+    # Describes the object independently of its position: equal signatures mean the same
+    # text span, path or image, possibly moved.
+    signature: Tuple
+    label: str
+
+
+def _rounded(values, digits: int = 1) -> Tuple:
+    return tuple(round(v, digits) for v in values) if values is not None else None
+
+
+def text_objects(page: fitz.Page) -> List[PageObject]:
+    objects = []
+    for block in page.get_text("rawdict", flags=TEXT_FLAGS)['blocks']:
+        for line in block.get('lines', ()):
+            for span in line['spans']:
+                text = "".join(char['c'] for char in span['chars'])
+                if not text.strip():
+                    continue
+                signature = ('text', text, span['font'], round(span['size'], 1), span['color'], _rounded(line['dir'], 3))
+                objects.append(PageObject('text', tuple(span['bbox']), signature, text))
+    return objects
+
+
+def _path_items(path: Dict[str, Any]) -> Tuple:
+    # Path geometry relative to the top-left corner of the path, so a moved path keeps its signature.
+    x0, y0 = path['rect'].x0, path['rect'].y0
+    items = []
+    for item in path['items']:
+        points = []
+        for value in item[1:]:
+            if isinstance(value, fitz.Point):
+                points.extend((value.x - x0, value.y - y0))
+            elif isinstance(value, fitz.Rect):
+                points.extend((value.x0 - x0, value.y0 - y0, value.x1 - x0, value.y1 - y0))
+            elif isinstance(value, fitz.Quad):
+                for point in (value.ul, value.ur, value.ll, value.lr):
+                    points.extend((point.x - x0, point.y - y0))
+        items.append((item[0],) + _rounded(points))
+    return tuple(items)
+
+
+def drawing_objects(page: fitz.Page) -> List[PageObject]:
+    objects = []
+    for path in page.get_drawings():
+        signature = ('drawing', path['type'], _rounded(path.get('color'), 3), _rounded(path.get('fill'), 3),
+                     round(path.get('width') or 0, 2), _path_items(path))
+        objects.append(PageObject('drawing', tuple(path['rect']), signature, PATH_LABELS.get(path['type'], path['type'])))
+    return objects
+
+
+def image_objects(page: fitz.Page) -> List[PageObject]:
+    objects = []
+    for info in page.get_image_info(hashes=True):
+        bbox = tuple(info['bbox'])
+        # The displayed size is part of the signature: a rescaled image is a different object.
+        signature = ('image', info['digest'].hex(), round(bbox[2] - bbox[0], 1), round(bbox[3] - bbox[1], 1))
+        objects.append(PageObject('image', bbox, signature, f"{info['width']}x{info['height']}"))
+    return objects
+
+
+def page_objects(page: Optional[fitz.Page]) -> List[PageObject]:
+    if page is None:
+        return []
+    return text_objects(page) + drawing_objects(page) + image_objects(page)
+
+
+class GridIndex:
+    """
+    Uniform grid over the page: every object is listed in each cell its bounding box
+    touches, so finding the objects near a box only looks at a few cells. Objects
+    spanning more than max_cells cells per side, e.g. page backgrounds or unbounded
+    clip paths, are returned by every query instead.
+    """
+
+    def __init__(self, objects: List[PageObject], cell: float = GRID_CELL, max_cells: int = 32):
+        self.cell = cell
+        self.max_cells = max_cells
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.large: Set[int] = set()
+        for index, obj in enumerate(objects):
+            cell_range = self._cell_range(obj.bbox, 0)
+            if cell_range is None:
+                self.large.add(index)
+                continue
+            for key in cell_range:
+                self.cells[key].append(index)
+
+    def _cell_range(self, bbox: BBox, margin: float) -> Optional[List[Tuple[int, int]]]:
+        if not all(map(math.isfinite, bbox)):
+            return None
+        x0, y0, x1, y1 = bbox
+        columns = range(int((x0 - margin) // self.cell), int((x1 + margin) // self.cell) + 1)
+        rows = range(int((y0 - margin) // self.cell), int((y1 + margin) // self.cell) + 1)
+        if len(columns) > self.max_cells or len(rows) > self.max_cells:
+            return None
+        return [(gx, gy) for gx in columns for gy in rows]
+
+    def query(self, bbox: BBox, margin: float = 0.0) -> Set[int]:
+        found = set(self.large)
+        cell_range = self._cell_range(bbox, margin)
+        if cell_range is None:
+            # A large query box is rare enough to simply scan every cell.
+            cell_range = list(self.cells)
+        for key in cell_range:
+            found.update(self.cells.get(key, ()))
+        return found
+
+
+def _same_place(bbox1: BBox, bbox2: BBox, tolerance: float) -> bool:
+    return all(abs(a - b) <= tolerance for a, b in zip(bbox1, bbox2))
+
+
+def _overlaps(bbox1: BBox, bbox2: BBox) -> bool:
+    return bbox1[0] < bbox2[2] and bbox2[0] < bbox1[2] and bbox1[1] < bbox2[3] and bbox2[1] < bbox1[3]
+
+
+def _center_distance(bbox1: BBox, bbox2: BBox) -> float:
+    return math.hypot((bbox1[0] + bbox1[2] - bbox2[0] - bbox2[2]) / 2, (bbox1[1] + bbox1[3] - bbox2[1] - bbox2[3]) / 2)
+
+
+def match_objects(objects1: List[PageObject], objects2: List[PageObject], tolerance: float = VECTOR_TOLERANCE) -> Dict[str, Any]:
+    """
+    Match the objects of two pages. Objects with the same signature at the same place
+    are unchanged; those with the same signature elsewhere on the page are moved (the
+    nearest one is taken). Images overlapping an image with another signature are
+    returned as 'replaced' candidates for a raster check. Everything else is removed
+    (only in objects1) or added (only in objects2).
+    """
+    grid = GridIndex(objects2)
+    unmatched2 = set(range(len(objects2)))
+    unmatched1 = []
+    unchanged = 0
+    for index1, obj in enumerate(objects1):
+        match = None
+        for index2 in grid.query(obj.bbox, tolerance) & unmatched2:
+            candidate = objects2[index2]
+            if candidate.signature == obj.signature and _same_place(obj.bbox, candidate.bbox, tolerance):
+                match = index2
+                break
+        if match is None:
+            unmatched1.append(index1)
+        else:
+            unmatched2.discard(match)
+            unchanged += 1
+
+    by_signature: Dict[Tuple, List[int]] = defaultdict(list)
+    for index2 in sorted(unmatched2):
+        by_signature[objects2[index2].signature].append(index2)
+    moved = []
+    removed = []
+    for index1 in unmatched1:
+        obj = objects1[index1]
+        candidates = by_signature.get(obj.signature)
+        if candidates:
+            nearest = min(candidates, key=lambda index2: _center_distance(obj.bbox, objects2[index2].bbox))
+            candidates.remove(nearest)
+            unmatched2.discard(nearest)
+            moved.append((obj, objects2[nearest]))
+        else:
+            removed.append(obj)
+
+    replaced = []
+    for obj in [obj for obj in removed if obj.kind == 'image']:
+        for index2 in sorted(grid.query(obj.bbox) & unmatched2):
+            candidate = objects2[index2]
+            if candidate.kind == 'image' and _overlaps(obj.bbox, candidate.bbox):
+                replaced.append((obj, candidate))
+                removed.remove(obj)
+                unmatched2.discard(index2)
+                break
+    added = [objects2[index2] for index2 in sorted(unmatched2)]
+    return {'unchanged': unchanged, 'moved': moved, 'removed': removed, 'added': added, 'replaced': replaced}
+
+
+def _raster_image_change(page1: fitz.Page, page2: fitz.Page, clip: fitz.Rect, threshold: int, zoom: float) -> Tuple[Optional[BBox], int]:
+    # Bounding box (in points) and pixel count of the changes inside clip, as in the tiled comparison.
+    patch1 = render_clip(page1, clip, zoom)
+    patch2 = render_clip(page2, clip, zoom)
+    height = max(patch1.shape[0], patch2.shape[0])
+    width = max(patch1.shape[1], patch2.shape[1])
+    diff = cv2.absdiff(cv2.cvtColor(_pad(patch1, height, width), cv2.COLOR_RGB2GRAY),
+                       cv2.cvtColor(_pad(patch2, height, width), cv2.COLOR_RGB2GRAY))
+    _, mask = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)
+    points = cv2.findNonZero(mask)
+    if points is None:
+        return None, 0
+    x, y, w, h = cv2.boundingRect(points)
+    return (clip.x0 + x / zoom, clip.y0 + y / zoom, clip.x0 + (x + w) / zoom, clip.y0 + (y + h) / zoom), int(cv2.countNonZero(mask))
+
+
+def _change(obj: PageObject) -> Dict[str, Any]:
+    return {'kind': obj.kind, 'bbox': obj.bbox, 'label': obj.label}
+
+
+def compare_pages_vector(page1: Optional[fitz.Page], page2: Optional[fitz.Page], threshold: int,
+                         tolerance: float = VECTOR_TOLERANCE, image_zoom: float = FINE_ZOOM) -> Dict[str, Any]:
+    """
+    Object-level page comparison. Text spans, vector paths and image placements of both
+    pages are matched by signature and position; nothing is rendered except the area of
+    images replaced by a different one, which is diffed at image_zoom to tell re-encoded
+    copies from real changes. A missing page counts as an empty one.
+
+    Returns the changed bounding boxes in PDF points (pdf1 coordinates for removed
+    objects and the old place of moved ones, pdf2 coordinates otherwise), the number of
+    changed image pixels and the 'vector_changes' lists: added, removed, moved (with the
+    'from' box) and changed images.
+    """
+    matches = match_objects(page_objects(page1), page_objects(page2), tolerance)
+    changes = {
+        'added': [_change(obj) for obj in matches['added']],
+        'removed': [_change(obj) for obj in matches['removed']],
+        'moved': [dict(_change(new), **{'from': old.bbox}) for old, new in matches['moved']],
+        'changed': [],
+    }
+    changed_pixels = 0
+    for old, new in matches['replaced']:
+        bbox, pixels = _raster_image_change(page1, page2, fitz.Rect(old.bbox) | fitz.Rect(new.bbox), threshold, image_zoom)
+        if bbox is not None:
+            changes['changed'].append(dict(_change(new), bbox=bbox))
+            changed_pixels += pixels
+
+    boxes = [change['bbox'] for kind in ('removed', 'added', 'changed') for change in changes[kind]]
+    for change in changes['moved']:
+        boxes.extend((change['from'], change['bbox']))
+    return {'changed_boxes': boxes, 'changed_pixels': changed_pixels, 'vector_changes': changes}
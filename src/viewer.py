@@ -0,0 +1,128 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageEnhance, ImageFilter
+
+from .utils import resize_image
+
+# Display-sized pages kept for instant page flips; each entry is two small images.
+DISPLAY_CACHE_SIZE = 32
+
+
+class DisplayRequest(NamedTuple):
+    page: int
+    width: int
+    height: int
+    contrast: float
+    brightness: float
+
+
+class PageViewer:
+    """
+    Produces the images shown by the GUI on a background thread.
+
+    Only the latest request is kept: requests arriving while a page is being prepared
+    replace each other, so dragging a slider or resizing the window never queues up
+    work. Pages are scaled to the viewport and sharpened once per (page, size,
+    threshold, colour intensity) and cached; contrast and brightness are then applied
+    to the small images. After each request the previous and next pages are
+    prefetched. deliver(request, image1, image2, diff_data) is called on the worker
+    thread, so the caller must hand the result over to its UI thread itself.
+    """
+
+    def __init__(self, pdf_tool, deliver: Callable[[DisplayRequest, Image.Image, Image.Image, Dict[str, Any]], None],
+                 cache_size: int = DISPLAY_CACHE_SIZE):
+        self.pdf_tool = pdf_tool
+        self.deliver = deliver
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple, Tuple[Image.Image, Image.Image]]' = OrderedDict()
+        self._request: Optional[DisplayRequest] = None
+        self._prefetch: list = []
+        self._closed = False
+        self._condition = threading.Condition()
+        # Held while a page is being prepared, so invalidate() can wait for it.
+        self._render_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="page-viewer", daemon=True)
+        self._thread.start()
+
+    def request(self, page: int, width: int, height: int, contrast: float = 1.0, brightness: float = 0.0) -> None:
+        if width <= 1 or height <= 1:
+            return
+        with self._condition:
+            self._request = DisplayRequest(page, width, height, contrast, brightness)
+            self._prefetch = []
+            self._condition.notify()
+
+    def invalidate(self) -> None:
+        # Drops pending work and cached images; call before the comparison results change.
+        with self._condition:
+            self._request = None
+            self._prefetch = []
+        with self._render_lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _next_job(self) -> Optional[Tuple[Tuple, Optional[DisplayRequest]]]:
+        with self._condition:
+            while not self._closed and self._request is None and not self._prefetch:
+                self._condition.wait()
+            if self._closed:
+                return None
+            if self._request is not None:
+                request, self._request = self._request, None
+                self._prefetch = [request._replace(page=request.page + step) for step in (1, -1)]
+                return self._scaled_key(request), request
+            return self._scaled_key(self._prefetch.pop(0)), None
+
+    def _scaled_key(self, request: DisplayRequest) -> Tuple:
+        return (request.page, request.width, request.height, self.pdf_tool.threshold, self.pdf_tool.color_intensity)
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            key, request = job
+            try:
+                with self._render_lock:
+                    if not 0 <= key[0] < len(self.pdf_tool.diff_images):
+                        continue
+                    images = self._scaled(key)
+                    diff_data = self.pdf_tool.diff_images[key[0]]
+                if request is not None and images is not None:
+                    self.deliver(request, *self._adjust(images, request), diff_data)
+            except Exception as e:
+                logging.error(f"Erro ao preparar a página {key[0] + 1} para exibição: {str(e)}", exc_info=True)
+
+    def _scaled(self, key: Tuple) -> Optional[Tuple[Image.Image, Image.Image]]:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        page, width, height = key[:3]
+        base = self.pdf_tool.get_base_image(page)
+        diff_data = self.pdf_tool.get_diff_image(page)
+        if base is None or diff_data is None or diff_data['image'] is None:
+            return None
+        # Scaling first means sharpening and the slider adjustments work on display-sized images.
+        images = tuple(
+            resize_image(Image.fromarray(image.astype('uint8')), width, height).filter(ImageFilter.SHARPEN)
+            for image in (base, diff_data['image'])
+        )
+        self._cache[key] = images
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return images
+
+    def _adjust(self, images: Tuple[Image.Image, Image.Image], request: DisplayRequest) -> Tuple[Image.Image, Image.Image]:
+        adjusted = []
+        for image in images:
+            image = ImageEnhance.Contrast(image).enhance(request.contrast)
+            image = ImageEnhance.Brightness(image).enhance(1 + request.brightness / 100)
+            adjusted.append(image)
+        return tuple(adjusted)
@@ -0,0 +1,91 @@
+import random
+
+import fitz
+import pytest
+
+from src.alignment import PageSignatures, _align_gap, align_pages, index_pairs
+from src.fingerprint import document_fingerprints
+
+INVOICE = ["Invoice 2024-118", "ACME Supplies", "Widget 3 x 10.00 30.00", "Gadget 1 x 25.00", "Total 55.00", "Due in 30 days"]
+
+
+def make_document(pages):
+    document = fitz.open()
+    for lines in pages:
+        page = document.new_page()
+        for k, line in enumerate(lines):
+            page.insert_text((72, 72 + 20 * k), line, fontsize=11)
+    return document
+
+
+def signatures(document):
+    return PageSignatures(document, document_fingerprints(document))
+
+
+def edited(lines, old, new):
+    return [line.replace(old, new) for line in lines]
+
+
+def text_page(number):
+    return [f"Chapter {number}", f"Section {number} opening paragraph with its own words", f"Page body {number}"]
+
+
+def test_edited_single_page_invoice_is_matched():
+    document1 = make_document([INVOICE])
+    document2 = make_document([edited(edited(INVOICE, "Widget 3", "Widget 4"), "Total 55.00", "Total 65.00")])
+    assert align_pages(signatures(document1), signatures(document2)) == [(0, 0)]
+
+
+def test_equal_count_gap_pairs_by_position():
+    document1 = make_document([text_page(1), INVOICE, text_page(3)])
+    document2 = make_document([text_page(1), ["Completely", "different", "content"], text_page(3)])
+    assert align_pages(signatures(document1), signatures(document2)) == [(0, 0), (1, 1), (2, 2)]
+
+
+def test_equal_count_gap_with_insert_and_delete_is_aligned():
+    # Every footer changed, so no page is an anchor; a cover was added and the last page dropped.
+    pages = [text_page(n) + ["Draft 1 of 8"] for n in range(1, 9)]
+    revised = [edited(page, "Draft 1", "Final 2") for page in pages]
+    document1 = make_document(pages)
+    document2 = make_document([["Cover", "Annual contract review"]] + revised[:-1])
+    expected = [(None, 0)] + [(k, k + 1) for k in range(7)] + [(7, None)]
+    assert align_pages(signatures(document1), signatures(document2)) == expected
+
+
+def test_inserted_page_keeps_later_pages_aligned():
+    pages = [text_page(n) for n in range(1, 6)]
+    document1 = make_document(pages)
+    document2 = make_document(pages[:2] + [INVOICE] + pages[2:])
+    assert align_pages(signatures(document1), signatures(document2)) == [(0, 0), (1, 1), (None, 2), (2, 3), (3, 4), (4, 5)]
+
+
+def test_deleted_page_next_to_edited_page():
+    pages = [text_page(n) for n in range(1, 5)]
+    document1 = make_document(pages)
+    document2 = make_document([pages[0], edited(pages[2], "opening", "closing"), pages[3]])
+    assert align_pages(signatures(document1), signatures(document2)) == [(0, 0), (1, None), (2, 1), (3, 2)]
+
+
+def test_all_pages_deleted_or_inserted():
+    document = make_document([text_page(1), text_page(2)])
+    empty = make_document([])
+    assert align_pages(signatures(document), signatures(empty)) == [(0, None), (1, None)]
+    assert align_pages(signatures(empty), signatures(document)) == [(None, 0), (None, 1)]
+
+
+@pytest.mark.parametrize("band", [0, 1, 16])
+def test_align_gap_covers_every_page_for_any_band(band):
+    generator = random.Random(band)
+    for _ in range(20):
+        n, m = generator.randint(0, 4), generator.randint(0, 4)
+        choices = [text_page(1), text_page(2), INVOICE, ["Unrelated"]]
+        document1 = make_document([generator.choice(choices) for _ in range(n)])
+        document2 = make_document([generator.choice(choices) for _ in range(m)])
+        pairs = _align_gap(signatures(document1), 0, n, signatures(document2), 0, m, 0.3, band)
+        assert [i for i, _ in pairs if i is not None] == list(range(n))
+        assert [j for _, j in pairs if j is not None] == list(range(m))
+        assert all(i is not None or j is not None for i, j in pairs)
+
+
+def test_index_pairs():
+    assert index_pairs(2, 3) == [(0, 0), (1, 1), (None, 2)]
@@ -0,0 +1,47 @@
+import fitz
+import numpy as np
+
+from src.cache import RenderCache
+from src.pdf_tool import PDFComparisonTool
+
+PAGES = 3
+
+
+def write_revision(path, revision):
+    # Every page of a revision differs from the baseline, so all of them are rendered.
+    document = fitz.open()
+    for number in range(PAGES):
+        page = document.new_page()
+        page.insert_text((72, 72), f"Contrato, página {number + 1}", fontsize=11)
+        page.insert_text((72, 100), f"Cláusula revisada {revision}" if revision else "Cláusula original", fontsize=11)
+    document.save(str(path))
+    return str(path)
+
+
+def test_put_get_round_trip_and_eviction(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+    image = np.random.default_rng(0).integers(0, 256, size=(40, 30, 3), dtype=np.uint8)
+    key = cache.page_key("ab" * 32, 0, 2.0, 2.0)
+    assert cache.get(key) is None
+    cache.put(key, image)
+    assert np.array_equal(cache.get(key), image)
+
+    cache.max_bytes = 0
+    cache.evict()
+    assert cache.get(key) is None
+
+
+def test_revisions_reuse_the_cached_baseline(tmp_path):
+    baseline = write_revision(tmp_path / "base.pdf", 0)
+    raw_page_bytes = 1191 * 1684 * 3
+    # Smaller than the uncompressed rasters of a single document.
+    budget = 2 * raw_page_bytes
+    tool = PDFComparisonTool(cache_dir=str(tmp_path / "cache"), cache_max_bytes=budget)
+    counters = []
+    for revision in (1, 2, 3):
+        tool.process_pdfs_streaming(baseline, write_revision(tmp_path / f"rev{revision}.pdf", revision))
+        counters.append(tool.metrics.summary()['counters'])
+    assert counters[0].get('cache_hits', 0) == 0
+    for later in counters[1:]:
+        assert later['cache_hits'] == PAGES
+        assert later['cache_misses'] == PAGES
@@ -0,0 +1,100 @@
+import json
+import os
+
+import fitz
+import pytest
+
+from src.cli import BATCH_SUMMARY_FILE, SUMMARY_FILE, read_manifest, read_summary, run_batch
+
+OPTIONS = {
+    'cache_dir': None,
+    'threshold': 30,
+    'color_intensity': 0.3,
+    'mode': 'streaming',
+    'workers': 1,
+    'images': False,
+    'report': False,
+    'trace': False,
+    'store': None,
+}
+
+
+def write_pdf(path, text):
+    document = fitz.open()
+    document.new_page().insert_text((72, 72), text, fontsize=11)
+    document.save(str(path))
+    return str(path)
+
+
+def write_manifest(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return str(path)
+
+
+def test_csv_manifest_resolves_paths_and_skips_header(tmp_path):
+    manifest = write_manifest(tmp_path / "lote.csv", ["pdf1,pdf2,id", "a.pdf,b.pdf,fatura-1", "# comentário", "c.pdf,d.pdf"])
+    jobs = read_manifest(manifest)
+    assert [job['id'] for job in jobs][0] == 'fatura-1'
+    assert jobs[0]['pdf1'] == os.path.join(str(tmp_path), 'a.pdf')
+    assert jobs[1]['id'].startswith('d-')
+
+
+def test_jsonl_manifest_ids_cannot_leave_the_output_directory(tmp_path):
+    manifest = write_manifest(tmp_path / "lote.jsonl", [
+        json.dumps({'pdf1': 'a.pdf', 'pdf2': 'b.pdf', 'id': '../escaped'}),
+        json.dumps({'pdf1': 'a.pdf', 'pdf2': 'c.pdf', 'id': 'sub/dir'}),
+    ])
+    for job in read_manifest(manifest):
+        assert os.sep not in job['id'] and not job['id'].startswith('.')
+
+
+@pytest.mark.parametrize("job_id", ["..", ".", "   "])
+def test_manifest_rejects_ids_without_a_directory_name(tmp_path, job_id):
+    manifest = write_manifest(tmp_path / "lote.jsonl", [json.dumps({'pdf1': 'a.pdf', 'pdf2': 'b.pdf', 'id': job_id})])
+    with pytest.raises(ValueError):
+        read_manifest(manifest)
+
+
+def test_manifest_rejects_duplicate_ids(tmp_path):
+    manifest = write_manifest(tmp_path / "lote.csv", ["a.pdf,b.pdf,fatura", "c.pdf,d.pdf,fatura"])
+    with pytest.raises(ValueError):
+        read_manifest(manifest)
+
+
+def test_resume_skips_only_jobs_with_the_same_inputs(tmp_path):
+    pdf1 = write_pdf(tmp_path / "v1.pdf", "Fatura 118")
+    pdf2 = write_pdf(tmp_path / "v2.pdf", "Fatura 118")
+    output_dir = str(tmp_path / "saida")
+    jobs = [{'id': 'fatura', 'pdf1': pdf1, 'pdf2': pdf2}]
+
+    (first,) = run_batch(jobs, output_dir, OPTIONS, max_jobs=1)
+    assert first['status'] == 'ok' and first['pages_with_differences'] == []
+    (resumed,) = run_batch(jobs, output_dir, OPTIONS, max_jobs=1)
+    assert resumed == first
+
+    # Same id, regenerated file: the old summary must not be reused.
+    write_pdf(tmp_path / "v2.pdf", "Fatura 119")
+    os.utime(pdf2, ns=(first['inputs']['pdf2']['mtime_ns'] + 10 ** 9,) * 2)
+    (rerun,) = run_batch(jobs, output_dir, OPTIONS, max_jobs=1)
+    assert rerun['pages_with_differences'] == [1]
+    assert read_summary(os.path.join(output_dir, 'fatura')) == rerun
+
+
+def test_batch_summary_keeps_every_job(tmp_path):
+    pdf1 = write_pdf(tmp_path / "v1.pdf", "Contrato")
+    pdf2 = write_pdf(tmp_path / "v2.pdf", "Contrato revisado")
+    output_dir = str(tmp_path / "saida")
+    jobs = [{'id': 'igual', 'pdf1': pdf1, 'pdf2': pdf1}, {'id': 'revisado', 'pdf1': pdf1, 'pdf2': pdf2},
+            {'id': 'ausente', 'pdf1': pdf1, 'pdf2': str(tmp_path / "nao_existe.pdf")}]
+    run_batch(jobs, output_dir, OPTIONS, max_jobs=3)
+    with open(os.path.join(output_dir, BATCH_SUMMARY_FILE), encoding='utf-8') as summary_file:
+        batch = json.load(summary_file)
+    assert (batch['total'], batch['ok'], batch['failed']) == (3, 2, 1)
+    assert [(job['id'], job['status']) for job in batch['jobs']] == [('igual', 'ok'), ('revisado', 'ok'), ('ausente', 'error')]
+    assert os.path.exists(os.path.join(output_dir, 'ausente', SUMMARY_FILE))
+
+
+def test_run_batch_rejects_jobs_sharing_a_directory(tmp_path):
+    jobs = [{'id': 'fatura', 'pdf1': 'a.pdf', 'pdf2': 'b.pdf'}, {'id': 'fatura', 'pdf1': 'a.pdf', 'pdf2': 'c.pdf'}]
+    with pytest.raises(ValueError):
+        run_batch(jobs, str(tmp_path / "saida"), OPTIONS, max_jobs=2)
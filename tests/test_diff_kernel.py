@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+
+from src.pdf_tool import PDFComparisonTool
+
+
+def reference_compare(img1, img2, threshold, color_intensity):
+    # compare_images as it was written before DiffKernel.
+    height = max(img1.shape[0], img2.shape[0])
+    width = max(img1.shape[1], img2.shape[1])
+    img1 = cv2.resize(img1, (width, height))
+    img2 = cv2.resize(img2, (width, height))
+    diff = cv2.absdiff(cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY), cv2.cvtColor(img2, cv2.COLOR_RGB2GRAY))
+    _, thresh = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)
+    result = np.zeros_like(img1)
+    result[thresh == 0] = [0, 255, 0]
+    result[thresh != 0] = [0, 0, 255]
+    return cv2.addWeighted(img1, 1 - color_intensity, result, color_intensity, 0)
+
+
+def page(height, width, text):
+    image = np.full((height, width, 3), 255, np.uint8)
+    cv2.putText(image, text, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2, cv2.LINE_AA)
+    return image
+
+
+def test_compare_images_matches_the_reference_blend():
+    tool = PDFComparisonTool()
+    img1 = page(120, 200, "Total 55.00")
+    for img2 in (page(120, 200, "Total 65.00"), page(130, 190, "Total 65.00"), img1.copy()):
+        expected = reference_compare(img1, img2, tool.threshold, tool.color_intensity)
+        assert np.array_equal(tool.compare_images(img1, img2), expected)
+
+
+def test_compare_images_results_are_not_overwritten_by_later_calls():
+    tool = PDFComparisonTool()
+    first = tool.compare_images(page(120, 200, "A"), page(120, 200, "B"))
+    kept = first.copy()
+    tool.compare_images(page(120, 200, "C"), page(120, 200, "D"))
+    assert np.array_equal(first, kept)
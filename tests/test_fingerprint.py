@@ -0,0 +1,85 @@
+import fitz
+
+import src.fingerprint
+import src.pdf_tool
+from src.fingerprint import document_fingerprints
+from src.pdf_tool import PDFComparisonTool
+
+CONTENT = b"q /GS0 gs 1 0 0 rg 100 100 200 200 re f Q"
+
+
+def new_object(document, text, stream=None):
+    xref = document.get_new_xref()
+    document.update_object(xref, text)
+    if stream is not None:
+        document.update_stream(xref, stream)
+    return xref
+
+
+def reopened(document):
+    return fitz.open("pdf", document.tobytes())
+
+
+def extgstate_document(alpha, padding=0):
+    # The page draws through an indirect ExtGState; padding shifts the object numbers.
+    document = fitz.open()
+    page = document.new_page()
+    for _ in range(padding):
+        new_object(document, "<<>>")
+    gs = new_object(document, f"<</Type/ExtGState/ca {alpha}/CA {alpha}>>")
+    document.xref_set_key(page.xref, "Resources", f"<</ExtGState<</GS0 {gs} 0 R>>>>")
+    document.xref_set_key(page.xref, "Contents", f"{new_object(document, '<<>>', CONTENT)} 0 R")
+    return reopened(document)
+
+
+def form_document(alpha):
+    # Same page content and form stream; only the ExtGState inside the form's resources differs.
+    document = fitz.open()
+    page = document.new_page()
+    gs = new_object(document, f"<</Type/ExtGState/ca {alpha}>>")
+    form = new_object(document, f"<</Type/XObject/Subtype/Form/BBox[0 0 612 792]/Resources<</ExtGState<</GS0 {gs} 0 R>>>>>>", CONTENT)
+    document.xref_set_key(page.xref, "Resources", f"<</XObject<</Fm0 {form} 0 R>>>>")
+    document.xref_set_key(page.xref, "Contents", f"{new_object(document, '<<>>', b'/Fm0 Do')} 0 R")
+    return reopened(document)
+
+
+def saved_pair(tmp_path):
+    paths = []
+    for name, alpha in (("v1.pdf", 0.2), ("v2.pdf", 0.9)):
+        path = str(tmp_path / name)
+        extgstate_document(alpha).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_indirect_extgstate_change_changes_the_fingerprint():
+    assert document_fingerprints(extgstate_document(0.2)) != document_fingerprints(extgstate_document(0.9))
+
+
+def test_equal_objects_under_other_numbers_keep_the_fingerprint():
+    assert document_fingerprints(extgstate_document(0.2)) == document_fingerprints(extgstate_document(0.2, padding=3))
+
+
+def test_form_xobject_resources_are_hashed():
+    assert document_fingerprints(form_document(0.2)) != document_fingerprints(form_document(0.9))
+    assert document_fingerprints(form_document(0.2)) == document_fingerprints(form_document(0.2))
+
+
+def test_streaming_comparison_reports_the_extgstate_change(tmp_path):
+    (page,) = PDFComparisonTool().process_pdfs_streaming(*saved_pair(tmp_path))
+    assert not page['identical']
+    assert page['has_differences']
+
+
+def test_streaming_comparison_fingerprints_each_page_once(tmp_path, monkeypatch):
+    calls = []
+    original = src.fingerprint.page_fingerprint
+
+    def counting(page, memo=None):
+        calls.append(page.number)
+        return original(page, memo)
+
+    monkeypatch.setattr(src.fingerprint, 'page_fingerprint', counting)
+    monkeypatch.setattr(src.pdf_tool, 'page_fingerprint', counting)
+    PDFComparisonTool().process_pdfs_streaming(*saved_pair(tmp_path))
+    assert len(calls) == 2
@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.page_store import PageStore
+
+
+def plane(seed, shape=(60, 40)):
+    return np.random.default_rng(seed).integers(0, 256, size=shape, dtype=np.uint8)
+
+
+def test_arrays_past_the_budget_spill_and_read_back(tmp_path):
+    arrays = [plane(seed) for seed in range(5)]
+    store = PageStore(ram_budget=2 * arrays[0].nbytes, spill_dir=str(tmp_path))
+    handles = [store.put(array) for array in arrays]
+    assert store.memory_bytes <= store.ram_budget
+    assert store.spilled_bytes == 3 * arrays[0].nbytes
+    for handle, array in zip(handles, arrays):
+        assert np.array_equal(store.get(handle), array)
+
+    store.clear()
+    assert (store.memory_bytes, store.spilled_bytes) == (0, 0)
+
+
+def test_mask_follows_the_threshold_of_the_cropped_diff():
+    base = np.full((50, 80), 255, np.uint8)
+    diff = np.zeros((50, 80), np.uint8)
+    diff[10:20, 30:45] = 40
+    diff[12, 31] = 200
+    store = PageStore(ram_budget=0)
+    page = store.add_page(base, diff, threshold=30)
+    assert page.diff_box == (30, 10, 15, 10)
+    assert np.array_equal(store.base(page), base)
+    assert np.array_equal(store.mask(page, 30), np.where(diff > 30, 255, 0))
+    assert np.array_equal(store.mask(page, 100), np.where(diff > 100, 255, 0))
+
+
+def test_identical_page_has_an_empty_mask():
+    store = PageStore()
+    page = store.add_page(np.zeros((20, 30), np.uint8), None, threshold=30)
+    assert page.diff is None
+    assert not store.mask(page, 30).any()
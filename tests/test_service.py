@@ -0,0 +1,24 @@
+import json
+
+import pytest
+
+from src.service import MAX_RENDER_ZOOM, validate_job_options
+
+
+def test_valid_options_are_coerced():
+    options = validate_job_options({'threshold': 40.0, 'color_intensity': 1, 'render_zoom': 2, 'page_alignment': False})
+    assert options == {'threshold': 40, 'color_intensity': 1.0, 'render_zoom': 2.0, 'page_alignment': False}
+    assert type(options['threshold']) is int
+
+
+@pytest.mark.parametrize("options", [
+    {'threshold': "abc"}, {'threshold': 256}, {'threshold': -1}, {'threshold': 30.5}, {'threshold': True},
+    {'threshold': float('inf')}, {'threshold': float('-inf')}, {'threshold': float('nan')}, {'threshold': json.loads("1e400")},
+    {'color_intensity': 1.5}, {'color_intensity': None}, {'color_intensity': float('nan')}, {'render_zoom': float('inf')},
+    {'render_zoom': 0}, {'render_zoom': MAX_RENDER_ZOOM * 2}, {'render_zoom': "2"},
+    {'page_alignment': "yes"}, {'page_alignment': 1},
+    {'unknown': 1},
+])
+def test_invalid_options_raise_value_error(options):
+    with pytest.raises(ValueError):
+        validate_job_options(options)
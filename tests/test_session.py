@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from src.session import pack_mask, unpack_mask
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (7, 13), (64, 48)])
+def test_pack_mask_round_trip(shape):
+    mask = np.random.default_rng(shape[0]).integers(0, 2, size=shape, dtype=np.uint8) * 255
+    data = pack_mask(mask)
+    assert data['shape'] == list(shape)
+    restored = unpack_mask(data)
+    assert restored.dtype == np.uint8
+    assert np.array_equal(restored, mask)
+
+
+def test_pack_mask_treats_any_non_zero_value_as_changed():
+    mask = np.array([[0, 1, 128], [255, 0, 3]], np.uint8)
+    assert np.array_equal(unpack_mask(pack_mask(mask)), np.where(mask > 0, 255, 0))
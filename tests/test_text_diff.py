@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from src.text_diff import MAX_MYERS_EDITS, diff_pages, match_tokens, opcodes, similarity
+
+
+def random_pair(seed):
+    # A small alphabet gives both repeated tokens (Myers gaps) and unique ones (anchors).
+    generator = random.Random(seed)
+    a = [generator.randrange(12) for _ in range(generator.randrange(0, 80))]
+    b = list(a)
+    for _ in range(generator.randrange(0, 15)):
+        position = generator.randrange(len(b) + 1)
+        action = generator.choice(('insert', 'delete', 'replace'))
+        if action == 'insert' or not b:
+            b.insert(position, generator.randrange(12, 40))
+        elif action == 'delete' or position == len(b):
+            del b[min(position, len(b) - 1)]
+        else:
+            b[position] = generator.randrange(40)
+    return a, b
+
+
+def words(text, page_y=72.0):
+    return [(72.0 + 40 * k, page_y, 100.0 + 40 * k, page_y + 12, word) for k, word in enumerate(text.split())]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_are_an_increasing_common_subsequence(seed):
+    a, b = random_pair(seed)
+    matches = match_tokens(a, b)
+    for (i1, j1), (i2, j2) in zip(matches, matches[1:]):
+        assert i1 < i2 and j1 < j2
+    assert all(0 <= i < len(a) and 0 <= j < len(b) and a[i] == b[j] for i, j in matches)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_opcodes_cover_both_sequences(seed):
+    a, b = random_pair(seed)
+    matches = match_tokens(a, b)
+    codes = opcodes(matches, len(a), len(b))
+    i = j = 0
+    for tag, i1, i2, j1, j2 in codes:
+        assert (i1, j1) == (i, j)
+        if tag == 'equal':
+            assert a[i1:i2] == b[j1:j2]
+        elif tag == 'delete':
+            assert i1 < i2 and j1 == j2
+        elif tag == 'insert':
+            assert i1 == i2 and j1 < j2
+        else:
+            assert tag == 'replace' and i1 < i2 and j1 < j2
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    assert sum(i2 - i1 for tag, i1, i2, _, _ in codes if tag == 'equal') == len(matches)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_identical_inputs_match_completely(seed):
+    a, _ = random_pair(seed)
+    matches = match_tokens(a, list(a))
+    assert matches == [(k, k) for k in range(len(a))]
+    assert similarity(len(matches), len(a), len(a)) == 1.0
+
+
+def test_empty_inputs_are_identical():
+    assert match_tokens([], []) == []
+    assert opcodes([], 0, 0) == []
+    assert similarity(0, 0, 0) == 1.0
+
+
+def test_gap_past_max_edits_becomes_a_single_replace():
+    # No token is unique to both sides and the ends differ, so the gap goes to Myers.
+    a = [1, 2] * 3
+    b = [2, 1] * 3
+    assert match_tokens(a, b, max_edits=1) == []
+    assert opcodes([], len(a), len(b)) == [('replace', 0, len(a), 0, len(b))]
+    assert len(match_tokens(a, b, max_edits=MAX_MYERS_EDITS)) == len(a) - 1
+
+
+def test_diff_pages_reports_replaced_words_with_their_page():
+    pages1 = [words("the quick brown fox"), words("jumps over the lazy dog")]
+    pages2 = [words("the quick brown fox"), words("jumps over the sleepy dog")]
+    result = diff_pages(pages1, pages2)
+    assert result['words1'] == result['words2'] == 9
+    assert result['similarity'] == pytest.approx(16 / 18)
+    assert len(result['spans']) == 1
+    span = result['spans'][0]
+    assert span['type'] == 'replace'
+    assert [(entry['page'], entry['text']) for entry in span['pdf1']] == [(2, 'lazy')]
+    assert [(entry['page'], entry['text']) for entry in span['pdf2']] == [(2, 'sleepy')]